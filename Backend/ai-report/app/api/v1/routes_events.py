@@ -0,0 +1,54 @@
+import asyncio, json
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.deps import auth_scheme, get_current_user, is_admin
+from app.core.config import settings
+from app.core import events
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+async def _sse(request: Request, sub: events.Subscription):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                ev = await asyncio.wait_for(sub.queue.get(), settings.EVENTS_HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"  # 프록시 유휴 타임아웃 방지
+                continue
+            payload = {k: v for k, v in ev.items() if k != "topics"}
+            yield f"event: {ev['type']}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+    finally:
+        sub.close()
+
+@router.get("/reports")
+async def report_events(
+    request: Request,
+    department_id: Optional[int] = Query(None, description="관리자: 이 부서 신고만(없으면 전체)"),
+    access_token: Optional[str] = Query(None, description="헤더를 못 붙이는 EventSource용"),
+    creds: HTTPAuthorizationCredentials = Depends(auth_scheme),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    신고 이벤트(report.created / report.status_changed / report.reassigned / comment.added)를 SSE로 푸시.
+    일반 사용자는 본인 신고, 관리자는 부서(또는 전체) 단위. 재연결 사이에 놓친 변경은 /reports/changes로 따라잡는다.
+    """
+    if creds is None and access_token:
+        creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    user = await get_current_user(creds, db)
+    await db.close()  # 스트림이 열려 있는 동안 DB 연결을 잡고 있지 않도록
+
+    if not is_admin(user):
+        topics = {f"user:{user.email}"}
+    else:
+        topics = {f"dept:{department_id}"} if department_id is not None else {"all"}
+    sub = events.broker.hub.subscribe(topics)
+    return StreamingResponse(_sse(request, sub), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, BackgroundTasks
+import base64, hashlib
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import List, Optional
+from sqlalchemy import select, desc, tuple_, literal
+from typing import List, Optional, Tuple
 
 from app.db.session import get_db
 from app.db.models.report import Report, ReportComment, ReportFile
-from app.db.schemas.report import ReportCreate, ReportUpdate, ReportOut, CommentCreate, CommentOut, FileOut
-from app.core.deps import get_current_user
-from app.core.mail import send_email
+from app.db.schemas.report import ReportCreate, ReportUpdate, ReportOut, ReportPage, ReportChanges, CommentCreate, CommentOut, FileOut
+from app.core.deps import get_current_user, is_admin
+from app.core.metrics import stage_latency
+from app.core.config import settings
+from app.db.base import utcnow
+from app.core import events
+from app.services import mailer
 
 # ML 분류기 (내부 라우트의 함수 재사용)
 from app.api.v1.routes_ml import router as ml_router  # for prefix 보장
@@ -30,13 +36,13 @@ async def create_report(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
     auto_classify: bool = Query(False),
-    background_tasks: BackgroundTasks = None,
 ):
     # 1) auto_classify가 true일 때만 임시 분류기 호출
     clf_type = None
     clf_dept = None
     if auto_classify:
-        clf_res = local_classify(ClassifyRequest(content=payload.content))
+        with stage_latency.time("classify"):
+            clf_res = local_classify(ClassifyRequest(content=payload.content))
         # local_classify는 동기 함수(pydantic 모델 반환). 필드 꺼내기
         clf_type = getattr(clf_res, "type", None)
         clf_dept = getattr(clf_res, "department_id", None)
@@ -53,15 +59,19 @@ async def create_report(
         reporter_email=getattr(user, "email", "anonymous@test.com"),
     )
     db.add(report)
-    await db.commit()
-    await db.refresh(report)
+    await db.flush()  # id 확보
 
-    # 3) 이메일 알림 (비동기 권장: BackgroundTasks)
-    if background_tasks is not None:
-        background_tasks.add_task(
-            send_email,
+    # 3) 이메일 알림: 같은 트랜잭션으로 아웃박스에 적재(발송은 services/mailer.py 워커)
+    #    요약 모드면 부서 요약 대기열로(우선 유형은 즉시)
+    email_to = _dept_email(report.department_id)
+    if mailer.digest_applies(report.type):
+        mailer.hold_for_digest(db, email_to=email_to, report=report)
+    else:
+        await mailer.enqueue(
+            db,
+            dedup_key=f"report-created:{report.id}",
+            email_to=email_to,
             subject=f"[신규 신고] #{report.id} {report.title}",
-            email_to=_dept_email(report.department_id),
             body=(
                 f"신고 ID: {report.id}\n"
                 f"제목: {report.title}\n"
@@ -71,22 +81,184 @@ async def create_report(
                 f"신고자: {report.reporter_email}\n"
             ),
         )
-    else:
-        # BackgroundTasks 주입이 안 된 경우라도 서비스 진행
-        try:
-            await send_email(
-                subject=f"[신규 신고] #{report.id} {report.title}",
-                email_to=_dept_email(report.department_id),
-                body=(
-                    f"신고 ID: {report.id}\n"
-                    f"제목: {report.title}\n"
-                    f"내용: {report.content}\n"
-                    f"유형: {report.type}\n"
-                    f"담당부서ID: {report.department_id}\n"
-                    f"신고자: {report.reporter_email}\n"
-                ),
-            )
-        except Exception:
-            pass
+    with stage_latency.time("db_commit"):
+        await db.commit()
+    await db.refresh(report)
+    mailer.notify()
+    await events.publish("report.created", report, events.topics_for(report.reporter_email, report.department_id),
+                         title=report.title, type=report.type)
 
     return report
+
+
+# ---------------- 목록(keyset 페이지네이션) ----------------
+def _encode_cursor(created_at: datetime, report_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{report_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, report_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(report_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("", response_model=ReportPage)
+async def list_reports(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+    status: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    department_id: Optional[int] = Query(None),
+    reporter_email: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    # 최신순((created_at, id) 내림차순). OFFSET 대신 마지막 항목 뒤부터 읽어서 페이지가 깊어져도 비용이 같다.
+    # 관리자가 아니면 본인 신고만
+    if not is_admin(user):
+        if reporter_email not in (None, user.email):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        reporter_email = user.email
+
+    q = select(Report)
+    if status is not None:
+        q = q.where(Report.status == status)
+    if type is not None:
+        q = q.where(Report.type == type)
+    if department_id is not None:
+        q = q.where(Report.department_id == department_id)
+    if reporter_email is not None:
+        q = q.where(Report.reporter_email == reporter_email)
+    if cursor:
+        ts, last_id = _decode_cursor(cursor)
+        q = q.where(tuple_(Report.created_at, Report.id) < tuple_(literal(ts, Report.created_at.type), literal(last_id)))
+    q = q.order_by(desc(Report.created_at), desc(Report.id)).limit(limit + 1)
+
+    rows = (await db.execute(q)).scalars().all()
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > limit else None
+    # 페이지 구성(id, updated_at)이 같으면 304 — 직렬화·전송 생략
+    etag = _etag(*((r.id, r.updated_at) for r in items), next_cursor)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return ReportPage(items=items, next_cursor=next_cursor)
+
+
+# ---------------- 변경분 동기화 / 조건부 GET ----------------
+def _etag(*parts) -> str:
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    return inm.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in inm.split(","))
+
+async def _get_visible(db: AsyncSession, user, report_id: int) -> Report:
+    report = await db.get(Report, report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if not is_admin(user) and report.reporter_email != user.email:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return report
+
+@router.get("/changes", response_model=ReportChanges)
+async def report_changes(
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+    since: Optional[str] = Query(None, description="이전 응답의 cursor(없으면 처음부터)"),
+    limit: int = Query(100, ge=1, le=500),
+):
+    """
+    since 이후 생성·수정된 신고만 (updated_at, id) 오름차순으로. 변경이 없으면 인덱스 조회 한 번에 빈 목록.
+    방금(REPORT_CHANGES_SETTLE_MS 이내) 바뀐 행은 다음 폴링으로 미뤄, 늦게 커밋된 앞선 시각의 행을 건너뛰지 않게 한다.
+    """
+    q = select(Report).where(Report.updated_at <= utcnow() - timedelta(milliseconds=settings.REPORT_CHANGES_SETTLE_MS))
+    if not is_admin(user):
+        q = q.where(Report.reporter_email == user.email)
+    if since:
+        ts, last_id = _decode_cursor(since)
+        q = q.where(tuple_(Report.updated_at, Report.id) > tuple_(literal(ts, Report.updated_at.type), literal(last_id)))
+    q = q.order_by(Report.updated_at, Report.id).limit(limit + 1)
+
+    rows = (await db.execute(q)).scalars().all()
+    items = rows[:limit]
+    cursor = _encode_cursor(items[-1].updated_at, items[-1].id) if items else since
+    return ReportChanges(items=items, cursor=cursor, has_more=len(rows) > limit)
+
+@router.get("/{report_id}", response_model=ReportOut)
+async def get_report(
+    report_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    report = await _get_visible(db, user, report_id)
+    etag = _etag(report.id, report.updated_at)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return report
+
+@router.patch("/{report_id}", response_model=ReportOut)
+async def update_report(
+    report_id: int,
+    payload: ReportUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    report = await _get_visible(db, user, report_id)
+    changes = payload.model_dump(exclude_unset=True)
+    # 작성자는 title/content만, status/department_id는 관리자만
+    if not is_admin(user) and changes.keys() & {"status", "department_id"}:
+        raise HTTPException(status_code=403, detail="Only admins can change status or department")
+    old_status, old_dept = report.status, report.department_id
+    for k, v in changes.items():
+        setattr(report, k, v)
+    await db.commit()
+    await db.refresh(report)
+    if report.status != old_status:
+        await events.publish("report.status_changed", report,
+                             events.topics_for(report.reporter_email, report.department_id),
+                             old=old_status, new=report.status)
+    if report.department_id != old_dept:
+        # 이전 부서 구독자도 넘어간 것을 알 수 있게 양쪽 부서에 보냄
+        await events.publish("report.reassigned", report,
+                             events.topics_for(report.reporter_email, old_dept, report.department_id),
+                             old=old_dept, new=report.department_id)
+    response.headers["ETag"] = _etag(report.id, report.updated_at)
+    return report
+
+@router.get("/{report_id}/comments", response_model=List[CommentOut])
+async def list_comments(
+    report_id: int,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    await _get_visible(db, user, report_id)
+    q = select(ReportComment).where(ReportComment.report_id == report_id).order_by(ReportComment.id)
+    return (await db.execute(q)).scalars().all()
+
+@router.post("/{report_id}/comments", response_model=CommentOut)
+async def add_comment(
+    report_id: int,
+    payload: CommentCreate,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    report = await _get_visible(db, user, report_id)
+    comment = ReportComment(report_id=report.id, author_email=user.email, content=payload.content)
+    db.add(comment)
+    report.updated_at = utcnow()  # 변경분 동기화·ETag가 댓글 추가를 알아채도록
+    await db.commit()
+    await db.refresh(comment)
+    await events.publish("comment.added", report, events.topics_for(report.reporter_email, report.department_id),
+                         comment_id=comment.id, author_email=comment.author_email)
+    return comment
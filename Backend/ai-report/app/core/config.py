@@ -8,6 +8,14 @@ class Settings(BaseSettings):
     ACCESS_EXPIRES: int = 60 * 60 * 8 
     DB_URL: str = "sqlite+aiosqlite:///./dev.db"
     LOCAL_STORAGE_DIR: str = str(Path("./data/files").resolve())  # ★추가★
+    # /reports/changes: 이 시간(ms)보다 최근에 바뀐 행은 다음 폴링으로 미룬다(늦게 커밋되는 트랜잭션·워커 간 시계 차이 흡수)
+    REPORT_CHANGES_SETTLE_MS: int = 1000
+
+    # 신고 이벤트 푸시(SSE). EVENTS_REDIS_URL이 비어 있으면 프로세스 내 분배(단일 워커·테스트)
+    EVENTS_REDIS_URL: str = ""
+    EVENTS_CHANNEL: str = "report-events"
+    EVENTS_HEARTBEAT_SEC: int = 15
+    EVENTS_QUEUE_SIZE: int = 256  # 구독자별 대기 이벤트 상한(넘치면 버림)
 
 
     MAIL_USERNAME: str = ""
@@ -19,6 +27,22 @@ class Settings(BaseSettings):
     MAIL_TLS: bool = True
     MAIL_SSL: bool = False
 
+    # 메일 아웃박스 워커(services/mailer.py)
+    MAIL_OUTBOX_WORKER: bool = True   # 이 프로세스에서 워커를 돌릴지(전용 프로세스로 뺄 때 False)
+    MAIL_BATCH_SIZE: int = 50         # 한 번에 집어 가는 메일 수(같은 SMTP 세션으로 연속 전송)
+    MAIL_POLL_SEC: float = 2.0        # 새 메일 알림이 없을 때 폴링 주기
+    MAIL_LEASE_SEC: int = 120         # 집어 간 메일의 임대 시간(워커가 죽으면 이후 재시도)
+    MAIL_MAX_ATTEMPTS: int = 8
+    MAIL_RETRY_BASE_SEC: float = 5.0  # 재시도 간격 = base * 2^(시도-1), 최대 MAIL_RETRY_MAX_SEC
+    MAIL_RETRY_MAX_SEC: float = 900.0
+    MAIL_IDLE_SEC: float = 60.0       # 이보다 오래 쉰 SMTP 연결은 보내기 전에 NOOP으로 확인
+
+    # 부서별 요약 메일: 켜면 신규 신고 알림을 창 단위로 모아 수신자별 한 통으로 보냄
+    MAIL_DIGEST_ENABLED: bool = False
+    MAIL_DIGEST_WINDOW_SEC: int = 300     # 첫 알림이 쌓인 뒤 이 시간이 지나면 발송
+    MAIL_DIGEST_RECENT: int = 10          # 요약에 개별로 나열할 최근 신고 수
+    MAIL_DIGEST_IMMEDIATE_TYPES: str = "security"  # 쉼표 구분, 이 유형은 요약하지 않고 즉시 발송
+
 
     class Config:
         env_file = ".env"
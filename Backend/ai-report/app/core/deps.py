@@ -26,3 +26,6 @@ async def get_current_user(
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
+
+def is_admin(user) -> bool:
+    return getattr(user, "role", "user") == "admin"
@@ -0,0 +1,123 @@
+import asyncio, json, time
+from typing import Dict, Iterable, Optional, Set
+from app.core.config import settings
+
+# 신고 이벤트 팬아웃. 구독자는 토픽(user:<email> / dept:<id> / all) 단위로 받는다.
+# 프로세스 안에서는 Hub가 구독자별 asyncio.Queue로 나눠 주고, 워커가 여러 개면 RedisBroker가
+# 채널 하나로 모든 프로세스에 이벤트를 뿌린 뒤 각 프로세스의 Hub가 로컬 구독자에게 전달한다.
+
+def topics_for(reporter_email: str, *department_ids: Optional[int]) -> Set[str]:
+    t = {"all", f"user:{reporter_email}"}
+    t.update(f"dept:{d}" for d in department_ids if d is not None)
+    return t
+
+
+class Subscription:
+    def __init__(self, hub: "Hub", topics: Set[str]):
+        self.hub, self.topics = hub, topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.dropped = 0
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    """프로세스 내 토픽 → 구독자 분배. 느린 구독자는 큐가 차면 이벤트를 버린다(발행 쪽을 막지 않음)."""
+
+    def __init__(self):
+        self._subs: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        sub = Subscription(self, set(topics))
+        for t in sub.topics:
+            self._subs.setdefault(t, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for t in sub.topics:
+            s = self._subs.get(t)
+            if s is not None:
+                s.discard(sub)
+                if not s:
+                    del self._subs[t]
+
+    def dispatch(self, event: dict):
+        targets = set()
+        for t in event["topics"]:
+            targets |= self._subs.get(t, set())
+        for sub in targets:  # 여러 토픽에 걸친 구독자도 한 번만
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.dropped += 1
+
+    def stats(self) -> dict:
+        return {"topics": len(self._subs), "subscribers": len({s for v in self._subs.values() for s in v})}
+
+
+class InProcessBroker:
+    """단일 프로세스(개발·테스트)용: 발행이 곧 로컬 분배."""
+
+    def __init__(self):
+        self.hub = Hub()
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: dict):
+        self.hub.dispatch(event)
+
+
+class RedisBroker:
+    """Redis pub/sub 채널 하나로 워커 간 팬아웃. 프로세스마다 구독 연결 하나만 쓴다."""
+
+    def __init__(self, url: str, channel: str):
+        self.url, self.channel = url, channel
+        self.hub = Hub()
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        import redis.asyncio as aioredis
+        self._redis = aioredis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def publish(self, event: dict):
+        await self._redis.publish(self.channel, json.dumps(event, ensure_ascii=False, default=str))
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                async for msg in pubsub.listen():
+                    self.hub.dispatch(json.loads(msg["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # 연결이 끊기면 잠시 후 다시 구독
+                print("event listener reconnect:", e)
+                await asyncio.sleep(1)
+
+
+broker = RedisBroker(settings.EVENTS_REDIS_URL, settings.EVENTS_CHANNEL) if settings.EVENTS_REDIS_URL \
+    else InProcessBroker()
+
+
+async def publish(kind: str, report, topics: Set[str], **data):
+    """커밋 이후에 호출. 발행 실패가 요청을 실패시키지 않는다(클라이언트는 /reports/changes로 따라잡음)."""
+    event = {"type": kind, "report_id": report.id, "department_id": report.department_id,
+             "status": report.status, "ts": time.time(), "data": data, "topics": sorted(topics)}
+    try:
+        await broker.publish(event)
+    except Exception as e:
+        print("event publish failed:", e)
@@ -1,24 +0,0 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from app.core.config import settings
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_TLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL,
-    USE_CREDENTIALS=True
-)
-
-async def send_email(subject: str, email_to: str, body: str):
-    message = MessageSchema(
-        subject=subject,
-        recipients=[email_to],
-        body=body,
-        subtype="plain"
-    )
-    fm = FastMail(conf)
-    await fm.send_message(message)
@@ -1,3 +1,18 @@
+from datetime import datetime, timezone
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import DeclarativeBase
 class Base(DeclarativeBase):
     pass
+
+# SQLite는 시각을 문자열로 비교한다. server_default(CURRENT_TIMESTAMP)는 초 단위('... 12:00:00')로 저장되는데
+# 기본 DATETIME 바인딩은 '... 12:00:00.000000'을 만들어 커서 비교가 어긋나므로 저장 형식을 초 단위로 맞춘다.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+def utcnow() -> datetime:
+    # CURRENT_TIMESTAMP와 같은 기준(UTC, tz 없는 값)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
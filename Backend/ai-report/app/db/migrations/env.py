@@ -5,6 +5,7 @@ from alembic import context
 from app.db.base import Base
 from app.db.models.user import User
 from app.db.models.report import Department, Report, ReportFile, ReportComment
+from app.db.models.outbox import EmailOutbox, MailDigestItem
 from app.core.config import settings
 import os, sys
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
@@ -0,0 +1,49 @@
+"""reports listing indexes
+
+Revision ID: b7e2c4a91d3f
+Revises: 64229fbb54ed
+Create Date: 2026-10-18 10:12:40.218377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4a91d3f'
+down_revision: Union[str, Sequence[str], None] = '64229fbb54ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 단일 컬럼 인덱스는 같은 컬럼이 선두인 복합 인덱스가 대신하므로 교체(쓰기 비용 절감)
+COMPOSITE = {
+    'ix_reports_created_id': ['created_at', 'id'],
+    'ix_reports_status_created_id': ['status', 'created_at', 'id'],
+    'ix_reports_type_created_id': ['type', 'created_at', 'id'],
+    'ix_reports_department_created_id': ['department_id', 'created_at', 'id'],
+    'ix_reports_reporter_created_id': ['reporter_email', 'created_at', 'id'],
+}
+SINGLE = {
+    'ix_reports_created_at': ['created_at'],
+    'ix_reports_reporter_email': ['reporter_email'],
+    'ix_reports_status': ['status'],
+    'ix_reports_type': ['type'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, cols in COMPOSITE.items():
+        op.create_index(name, 'reports', cols, unique=False)
+    for name in SINGLE:
+        op.drop_index(name, table_name='reports')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, cols in SINGLE.items():
+        op.create_index(name, 'reports', cols, unique=False)
+    for name in COMPOSITE:
+        op.drop_index(name, table_name='reports')
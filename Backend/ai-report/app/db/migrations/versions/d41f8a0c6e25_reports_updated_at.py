@@ -0,0 +1,41 @@
+"""reports updated_at
+
+Revision ID: d41f8a0c6e25
+Revises: b7e2c4a91d3f
+Create Date: 2026-10-18 11:03:17.540921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f8a0c6e25'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c4a91d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # 기존 행은 생성 시각으로 채움(SQLite는 앱이 쓰는 마이크로초 형식에 맞춤)
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE reports SET updated_at = created_at || '.000000'")
+    else:
+        op.execute("UPDATE reports SET updated_at = created_at")
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_reports_updated_id', 'reports', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_reports_reporter_updated_id', 'reports', ['reporter_email', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_reporter_updated_id', table_name='reports')
+    op.drop_index('ix_reports_updated_id', table_name='reports')
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('updated_at')
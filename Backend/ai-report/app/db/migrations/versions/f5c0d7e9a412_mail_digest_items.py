@@ -0,0 +1,40 @@
+"""mail digest items
+
+Revision ID: f5c0d7e9a412
+Revises: e8a3f5b27c10
+Create Date: 2026-10-18 14:40:05.318264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c0d7e9a412'
+down_revision: Union[str, Sequence[str], None] = 'e8a3f5b27c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mail_digest_items',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('email_to', sa.String(length=255), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mail_digest_items_status_to', 'mail_digest_items', ['status', 'email_to', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mail_digest_items_status_to', table_name='mail_digest_items')
+    op.drop_table('mail_digest_items')
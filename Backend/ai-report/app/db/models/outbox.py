@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Text, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base, utcnow
+
+class EmailOutbox(Base):
+    """보낼 메일. 신고와 같은 트랜잭션으로 쌓이고 services/mailer.py 워커가 꺼내 보낸다."""
+    __tablename__ = "email_outbox"
+    # 워커 조회: status='pending' AND next_attempt_at <= now (id 순)
+    __table_args__ = (Index("ix_email_outbox_status_next", "status", "next_attempt_at"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    dedup_key: Mapped[str] = mapped_column(String(200), unique=True)
+    email_to: Mapped[str] = mapped_column(String(255))
+    subject: Mapped[str] = mapped_column(String(300))
+    body: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending / sent / failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # 다음 시도 시각. 워커가 집어 가면 임대 만료 시각으로 밀어 둔다(워커가 죽으면 만료 후 다른 워커가 재시도)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    claimed_by: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class MailDigestItem(Base):
+    """요약 메일로 모아 보낼 신규 신고 알림. 창(MAIL_DIGEST_WINDOW_SEC)이 지나면 수신자별로 한 통의 아웃박스 메일이 된다."""
+    __tablename__ = "mail_digest_items"
+    __table_args__ = (Index("ix_mail_digest_items_status_to", "status", "email_to", "id"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    email_to: Mapped[str] = mapped_column(String(255))
+    department_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    report_id: Mapped[int] = mapped_column(Integer)
+    type: Mapped[str] = mapped_column(String(50))
+    title: Mapped[str] = mapped_column(String(200))
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending / flushed
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
@@ -1,6 +1,7 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, func
+from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base import Base
+from datetime import datetime
+from app.db.base import Base, Timestamp, utcnow
 
 class Department(Base):
     __tablename__ = "departments"
@@ -9,14 +10,28 @@ class Department(Base):
 
 class Report(Base):
     __tablename__ = "reports"
+    # 목록 API의 keyset 정렬 (created_at, id)에 필터 컬럼을 앞에 붙인 복합 인덱스.
+    # 필터 = 선두 컬럼 동등 조건, 정렬·커서 = 뒤 두 컬럼 범위 스캔이라 정렬/오프셋 없이 limit개만 읽는다.
+    __table_args__ = (
+        Index("ix_reports_created_id", "created_at", "id"),
+        Index("ix_reports_status_created_id", "status", "created_at", "id"),
+        Index("ix_reports_type_created_id", "type", "created_at", "id"),
+        Index("ix_reports_department_created_id", "department_id", "created_at", "id"),
+        Index("ix_reports_reporter_created_id", "reporter_email", "created_at", "id"),
+        # 변경분 동기화(/reports/changes)의 (updated_at, id) 오름차순 커서
+        Index("ix_reports_updated_id", "updated_at", "id"),
+        Index("ix_reports_reporter_updated_id", "reporter_email", "updated_at", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    reporter_email: Mapped[str] = mapped_column(String(255), index=True)
+    reporter_email: Mapped[str] = mapped_column(String(255))
     title: Mapped[str] = mapped_column(String(200))
     content: Mapped[str] = mapped_column(Text)
-    type: Mapped[str] = mapped_column(String(50), index=True, default="general")
-    status: Mapped[str] = mapped_column(String(20), index=True, default="new")
+    type: Mapped[str] = mapped_column(String(50), default="general")
+    status: Mapped[str] = mapped_column(String(20), default="new")
     department_id: Mapped[int | None] = mapped_column(ForeignKey("departments.id"))
-    created_at: Mapped[str] = mapped_column(DateTime, server_default=func.now(), index=True)
+    created_at: Mapped[str] = mapped_column(Timestamp, server_default=func.now())
+    # 앱이 마이크로초 단위로 기록(같은 초 안의 수정도 순서가 갈림). 행이 바뀔 때마다 갱신
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
 
     department = relationship("Department")
     files = relationship("ReportFile", back_populates="report", cascade="all,delete-orphan")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from datetime import datetime
 
 class ReportCreate(BaseModel):
     title: str
@@ -23,8 +24,22 @@ class ReportOut(BaseModel):
     status: str
     department_id: Optional[int]
     reporter_email: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     class Config: from_attributes = True
 
+class ReportPage(BaseModel):
+    items: List[ReportOut]
+    # 다음 페이지 커서(마지막 항목의 created_at, id). None이면 끝
+    next_cursor: Optional[str] = None
+
+class ReportChanges(BaseModel):
+    # since 이후 생성·수정된 신고((updated_at, id) 오름차순)
+    items: List[ReportOut]
+    # 다음 폴링에 since로 넘길 커서(변경이 없으면 받은 since 그대로)
+    cursor: Optional[str] = None
+    has_more: bool = False
+
 class CommentCreate(BaseModel):
     content: str = Field(min_length=1)
 
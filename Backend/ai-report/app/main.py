@@ -1,10 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from app.api.v1.router import api_router
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry
 from app.db.session import AsyncSessionLocal
 from app.db.models.user import User
 from app.core.security import get_password_hash
+from app.core import events
+from app.core.config import settings
+from app.services import mailer
 
 app = FastAPI(title="AI Report Backend", version="0.1.0")
+app.add_middleware(MetricsMiddleware)  # 라우트별 요청 지연
 app.include_router(api_router, prefix="/api/v1")
 
 @app.on_event("startup")
@@ -33,6 +38,24 @@ async def seed_departments():
         await s.commit()
 
 
+@app.on_event("startup")
+async def start_events():
+    await events.broker.start()
+    if settings.MAIL_OUTBOX_WORKER:
+        await mailer.worker.start()
+
+@app.on_event("shutdown")
+async def stop_events():
+    await events.broker.stop()
+    await mailer.worker.stop()
+
+
 @app.get("/")
 def root():
     return {"service": "ai-report-backend", "status": "ok"}
+
+
+# Prometheus 스크랩용(텍스트 노출 형식)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
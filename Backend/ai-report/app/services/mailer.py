@@ -0,0 +1,276 @@
+import asyncio, hashlib, random, time, uuid
+from collections import defaultdict
+from datetime import timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional
+
+import aiosmtplib
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import stage_latency
+from app.db.base import utcnow
+from app.db.models.outbox import EmailOutbox, MailDigestItem
+from app.db.session import AsyncSessionLocal
+
+# 메일 아웃박스: 요청 처리 중에는 email_outbox에 행만 추가(신고와 같은 트랜잭션)하고,
+# 워커가 배치로 꺼내 오래 유지하는 SMTP 연결 하나로 보낸다. 실패는 지수 백오프로 재시도.
+# 전달 보장은 최소 한 번(보낸 직후 워커가 죽으면 임대 만료 뒤 다시 보냄) — Message-ID를 dedup_key로 고정해
+# 수신 측이 중복을 알아볼 수 있게 한다.
+
+_wake = asyncio.Event()
+
+
+async def enqueue(db: AsyncSession, *, dedup_key: str, email_to: str, subject: str, body: str) -> Optional[EmailOutbox]:
+    """세션에 메일을 추가(커밋은 호출 쪽 트랜잭션). 같은 dedup_key가 이미 있으면 추가하지 않는다."""
+    exists = (await db.execute(select(EmailOutbox.id).where(EmailOutbox.dedup_key == dedup_key))).first()
+    if exists:
+        return None
+    row = EmailOutbox(dedup_key=dedup_key, email_to=email_to, subject=subject, body=body)
+    db.add(row)
+    return row
+
+
+# ---------------- 부서별 요약(digest) ----------------
+IMMEDIATE_TYPES = {t.strip() for t in settings.MAIL_DIGEST_IMMEDIATE_TYPES.split(",") if t.strip()}
+
+
+def digest_applies(report_type: str) -> bool:
+    return settings.MAIL_DIGEST_ENABLED and report_type not in IMMEDIATE_TYPES
+
+
+def hold_for_digest(db: AsyncSession, *, email_to: str, report) -> MailDigestItem:
+    """개별 메일 대신 요약 대기열에 추가(커밋은 호출 쪽 트랜잭션)."""
+    item = MailDigestItem(email_to=email_to, department_id=report.department_id, report_id=report.id,
+                          type=report.type, title=report.title)
+    db.add(item)
+    return item
+
+
+def _digest_mail(items: List[MailDigestItem]):
+    by_type = defaultdict(list)
+    for it in items:
+        by_type[it.type].append(it)
+    groups = sorted(by_type.items(), key=lambda kv: -len(kv[1]))
+    summary = ", ".join(f"{t} {len(v)}" for t, v in groups)
+    subject = f"[신고 요약] 신규 신고 {len(items)}건 ({summary})"
+    lines = [f"{items[0].created_at:%Y-%m-%d %H:%M} ~ {items[-1].created_at:%H:%M} (UTC) 접수된 신규 신고 {len(items)}건입니다.", ""]
+    for t, group in groups:
+        lines.append(f"■ {t} — {len(group)}건")
+        recent = group[::-1][:settings.MAIL_DIGEST_RECENT]
+        for it in recent:
+            lines.append(f"  - #{it.report_id} {it.title} ({it.created_at:%H:%M:%S})")
+        if len(group) > len(recent):
+            lines.append(f"  … 외 {len(group) - len(recent)}건")
+        lines.append("")
+    return subject[:300], "\n".join(lines)
+
+
+async def flush_digests(db: AsyncSession) -> int:
+    """
+    첫 항목이 창보다 오래된 수신자마다 대기 항목을 한 통의 아웃박스 메일로 바꾼다. 만든 요약 메일 수를 돌려준다.
+    수신자별로 항목을 조건부 UPDATE(status='pending')로 먼저 집고, 읽은 항목을 전부 집었을 때만 메일을 만든다.
+    다른 워커가 그 사이 일부를 가져갔으면 이번 묶음은 되돌리고 남은 항목은 다음 주기에 다시 묶는다.
+    """
+    cutoff = utcnow() - timedelta(seconds=settings.MAIL_DIGEST_WINDOW_SEC)
+    due = (await db.execute(
+        select(MailDigestItem.email_to).where(MailDigestItem.status == "pending")
+        .group_by(MailDigestItem.email_to).having(func.min(MailDigestItem.created_at) <= cutoff)
+    )).scalars().all()
+    await db.commit()
+    made = 0
+    for email_to in due:
+        items = (await db.execute(
+            select(MailDigestItem).where(MailDigestItem.status == "pending", MailDigestItem.email_to == email_to)
+            .order_by(MailDigestItem.id)
+        )).scalars().all()
+        if not items:
+            await db.commit()
+            continue
+        ids = [it.id for it in items]
+        claimed = await db.execute(
+            update(MailDigestItem).where(MailDigestItem.id.in_(ids), MailDigestItem.status == "pending")
+            .values(status="flushed")
+        )
+        if claimed.rowcount != len(ids):
+            await db.rollback()
+            continue
+        subject, body = _digest_mail(items)
+        if await enqueue(db, dedup_key=f"digest:{ids[0]}", email_to=email_to, subject=subject, body=body) is None:
+            await db.rollback()
+            continue
+        try:
+            await db.commit()
+        except IntegrityError:  # 다른 워커가 같은 묶음의 메일을 먼저 커밋함
+            await db.rollback()
+            continue
+        made += 1
+    return made
+
+
+def notify():
+    """커밋 후 호출하면 워커가 폴링 주기를 기다리지 않고 바로 깬다(같은 프로세스일 때)."""
+    _wake.set()
+
+
+def backoff(attempts: int) -> float:
+    delay = min(settings.MAIL_RETRY_MAX_SEC, settings.MAIL_RETRY_BASE_SEC * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)  # 여러 건이 같은 순간에 몰리지 않게
+
+
+def _message(row: EmailOutbox) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    msg["To"] = row.email_to
+    msg["Subject"] = row.subject
+    msg["Message-ID"] = f"<{hashlib.sha1(row.dedup_key.encode()).hexdigest()}@ai-report>"
+    msg.set_content(row.body)
+    return msg
+
+
+class SmtpConnection:
+    """재사용하는 SMTP 세션. 끊겼거나 오래 쉬었으면 보내기 전에 다시 연결한다."""
+
+    def __init__(self):
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    async def _connect(self):
+        await self.close()
+        smtp = aiosmtplib.SMTP(hostname=settings.MAIL_SERVER, port=settings.MAIL_PORT,
+                               use_tls=settings.MAIL_SSL, start_tls=settings.MAIL_TLS)
+        await smtp.connect()
+        if settings.MAIL_USERNAME:
+            await smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        self._smtp = smtp
+        self.connects += 1
+
+    async def _ensure(self):
+        if self._smtp is None or not self._smtp.is_connected:
+            await self._connect()
+        elif time.monotonic() - self._last_used > settings.MAIL_IDLE_SEC:
+            try:
+                await self._smtp.noop()
+            except aiosmtplib.SMTPException:
+                await self._connect()
+
+    async def send(self, msg: EmailMessage):
+        await self._ensure()
+        try:
+            await self._smtp.send_message(msg)
+        except aiosmtplib.SMTPServerDisconnected:  # 서버가 유휴 연결을 끊은 경우 한 번 재연결
+            await self._connect()
+            await self._smtp.send_message(msg)
+        self._last_used = time.monotonic()
+
+    async def close(self):
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+
+class OutboxWorker:
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.conn = SmtpConnection()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = self.failed = self.retried = self.digests = 0
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.conn.close()
+
+    async def _run(self):
+        while True:
+            try:
+                if settings.MAIL_DIGEST_ENABLED:
+                    async with AsyncSessionLocal() as db:
+                        self.digests += await flush_digests(db)
+                n = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("mail outbox worker error:", e)
+                n = 0
+            if n >= settings.MAIL_BATCH_SIZE:
+                continue  # 밀린 게 더 있을 수 있음
+            _wake.clear()
+            try:
+                await asyncio.wait_for(_wake.wait(), settings.MAIL_POLL_SEC)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, db: AsyncSession) -> List[EmailOutbox]:
+        # 후보를 고른 뒤 조건부 UPDATE로 임대를 건다. 다른 워커가 먼저 집어 간 행은 조건에서 빠진다.
+        now = utcnow()
+        ids = (await db.execute(
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id).limit(settings.MAIL_BATCH_SIZE)
+        )).scalars().all()
+        if not ids:
+            return []
+        await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .values(claimed_by=self.worker_id, next_attempt_at=now + timedelta(seconds=settings.MAIL_LEASE_SEC))
+        )
+        await db.commit()
+        return (await db.execute(
+            select(EmailOutbox).where(EmailOutbox.id.in_(ids), EmailOutbox.claimed_by == self.worker_id,
+                                      EmailOutbox.status == "pending").order_by(EmailOutbox.id)
+        )).scalars().all()
+
+    async def drain_once(self) -> int:
+        """대기 중인 메일을 한 배치 보내고 결과를 기록. 처리한 건수를 돌려준다."""
+        async with AsyncSessionLocal() as db:
+            rows = await self._claim(db)
+            for row in rows:
+                try:
+                    with stage_latency.time("email_send"):
+                        await self.conn.send(_message(row))
+                except Exception as e:
+                    row.attempts += 1
+                    row.last_error = f"{type(e).__name__}: {e}"[:1000]
+                    # 5xx·수신자 거부는 다시 보내도 같으므로 바로 실패 처리
+                    permanent = isinstance(e, aiosmtplib.SMTPRecipientsRefused) or \
+                        (isinstance(e, aiosmtplib.SMTPResponseException) and e.code >= 500)
+                    if permanent or row.attempts >= settings.MAIL_MAX_ATTEMPTS:
+                        row.status = "failed"
+                        self.failed += 1
+                    else:
+                        row.next_attempt_at = utcnow() + timedelta(seconds=backoff(row.attempts))
+                        self.retried += 1
+                    row.claimed_by = None
+                    if isinstance(e, (aiosmtplib.SMTPConnectError, aiosmtplib.SMTPServerDisconnected, OSError)):
+                        # 서버에 닿지 않으면 남은 건도 실패할 것이므로 시도 횟수는 그대로 두고 잠시 미룸
+                        for rest in rows[rows.index(row) + 1:]:
+                            rest.next_attempt_at, rest.claimed_by = utcnow() + timedelta(seconds=backoff(1)), None
+                        break
+                    continue
+                row.status, row.sent_at, row.attempts, row.claimed_by = "sent", utcnow(), row.attempts + 1, None
+                self.sent += 1
+            await db.commit()
+            return len(rows)
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "failed": self.failed, "retried": self.retried, "digests": self.digests,
+                "smtp_connects": self.conn.connects}
+
+
+worker = OutboxWorker()
@@ -1,7 +1,9 @@
 
 # (Optional) Placeholder for future DB models beyond week 4.
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, String, Text
+from sqlalchemy import DateTime, Float, Integer, String, Text, func
 
 class Base(DeclarativeBase): pass
 
@@ -17,3 +19,12 @@ class Complaint(Base):
     content: Mapped[str] = mapped_column(Text)
     predicted_type: Mapped[str] = mapped_column(String(10))
     department_id: Mapped[int] = mapped_column(Integer)
+
+class PredictionLog(Base):
+    __tablename__ = "prediction_logs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    text: Mapped[str] = mapped_column(Text)
+    predicted_label: Mapped[str] = mapped_column(String(10))
+    confidence: Mapped[float] = mapped_column(Float)
+    model_version: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
@@ -1,9 +1,19 @@
 
-from fastapi import FastAPI
+import os, asyncio
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from .routes import ml, reports
 from .auth import router as auth_router
 from .services import model as _model
+from .services.batcher import model_batcher
+from .services import inference
+from .services.inference import InferenceOverloaded
+from .services.predlog import prediction_logger
+from .services import llm_router
+from .services.llm_router import close_client as close_llm_client
+from .services.cache import classify_cache
+from .services.metrics import CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry
 
 app = FastAPI(title="AI Complaint System")
 
@@ -12,15 +22,109 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)  # 가장 바깥: 라우트별 전체 지연
+
+MODEL_WATCH_SEC = float(os.getenv("MODEL_WATCH_SEC", "5"))  # 0이면 ACTIVE 파일 감시 끔
+_watch_task = None
 
 @app.on_event("startup")
 def _warmup():
     try:
         _model.load_model()
-        print("model warmed up")
+        print("model warmed up:", _model.active_version())
     except Exception as e:
         print("model warmup failed:", e)
 
+@app.on_event("startup")
+async def _start_watch():
+    global _watch_task
+    if MODEL_WATCH_SEC > 0:
+        _watch_task = asyncio.create_task(_model.watch_registry(MODEL_WATCH_SEC))
+
+@app.on_event("startup")
+async def _start_predlog():
+    try:
+        await prediction_logger.start()
+    except Exception as e:
+        print("prediction log disabled:", e)
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await prediction_logger.stop()
+    await close_llm_client()
+    if _watch_task is not None:
+        _watch_task.cancel()
+    await model_batcher.close()
+    inference.shutdown()
+
+@app.exception_handler(InferenceOverloaded)
+async def _overloaded(request: Request, exc: InferenceOverloaded):
+    # 대기열이 가득 차면 지연을 무한정 늘리지 않고 바로 503으로 돌려보낸다
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "inference queue full"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# ---- 스크랩 시점에 읽는 지표(이미 각 모듈이 세고 있는 값) ----
+def _caches():
+    return (("classify", classify_cache.stats()), ("llm", llm_router.stats()["cache"]))
+
+def _cache_counts():
+    out = {}
+    for name, st in _caches():
+        out[(name, "l1", "hit")] = st["l1"]["hits"]
+        out[(name, "l1", "miss")] = st["l1"]["misses"]
+        out[(name, "l2", "hit")] = st["l2_hits"]
+        out[(name, "l2", "miss")] = st["l2_misses"]
+    return out
+
+def _cache_ratios():
+    out = {}
+    for name, st in _caches():
+        out[(name, "l1")] = st["l1"]["hit_ratio"]
+        out[(name, "l2")] = st["l2_hit_ratio"]
+    return out
+
+def _queue_depths():
+    llm = llm_router.stats()
+    return {("inference_pending",): inference.stats()["pending"],
+            ("model_batcher",): model_batcher.stats()["queued"],
+            ("llm_batcher",): llm["batcher"]["queued"] if llm["batcher"] else 0,
+            ("llm_inflight",): llm["inflight"],
+            ("prediction_log",): prediction_logger.stats()["buffered"]}
+
+def _llm_hedges():
+    st = llm_router.stats()
+    return {("sent",): st["hedges"], ("won",): st["hedge_wins"]}
+
+def _predlog_rows():
+    st = prediction_logger.stats()
+    return {("flushed",): st["flushed"], ("dropped",): st["dropped"], ("failed",): st["failed"]}
+
+metrics_registry.callback("classifier_model_info", "Active model version",
+                          lambda: {(_model.active_version() or "none",): 1}, ("version",))
+metrics_registry.callback("classifier_cache_requests_total", "Cache lookups by tier and result",
+                          _cache_counts, ("cache", "tier", "result"), kind="counter")
+metrics_registry.callback("classifier_cache_hit_ratio", "Cache hit ratio by tier", _cache_ratios, ("cache", "tier"))
+metrics_registry.callback("classifier_queue_depth", "Items waiting per queue", _queue_depths, ("queue",))
+metrics_registry.callback("classifier_inference_rejected_total", "Requests rejected with 503",
+                          lambda: {(): inference.stats()["rejected"]}, kind="counter")
+metrics_registry.callback("classifier_llm_breaker_state", "LLM circuit breaker state (1 = current)",
+                          lambda: {(llm_router.stats()["breaker"]["state"],): 1}, ("state",))
+metrics_registry.callback("classifier_llm_breaker_trips_total", "LLM circuit breaker transitions to open",
+                          lambda: {(): llm_router.stats()["breaker"]["trips"]}, kind="counter")
+metrics_registry.callback("classifier_llm_breaker_short_circuits_total", "LLM calls skipped while the breaker was open",
+                          lambda: {(): llm_router.stats()["breaker"]["short_circuits"]}, kind="counter")
+metrics_registry.callback("classifier_llm_hedges_total", "Hedged LLM requests sent / won by the hedge",
+                          _llm_hedges, ("result",), kind="counter")
+metrics_registry.callback("classifier_prediction_log_rows_total", "Prediction log rows by outcome",
+                          _predlog_rows, ("result",), kind="counter")
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
+
 app.include_router(auth_router)
 app.include_router(ml.router)
 app.include_router(reports.router)
@@ -116,28 +116,28 @@ async def metrics():
     return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {"detail": "metrics not found"}
 """
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-import json
-from pathlib import Path
-
-from ..schemas import ClassifyIn, ClassifyOut, RouteOut, Evidence
-from ..services.model import predict, label_to_department, make_evidence
-from ..services.rules import THRESHOLD, apply_keyword_rules
-from ..deps import get_cache, get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+import asyncio
+from typing import List, Optional
+
+from ..schemas import ClassifyIn, ClassifyBatchIn, ClassifyOut, RouteOut, Evidence, ModelVersionsOut
+from ..services import cascade
+from ..services.model import (predict_batch, label_to_department, make_evidence, active_version, activate,
+                              classify_cache_key)
+from ..services import registry
+from ..services.batcher import model_batcher, predict_async
+from ..services import inference
+from ..services.cache import classify_cache
+from ..services.predlog import prediction_logger
+from ..services.metrics import stage_latency
+from ..deps import get_cache, get_current_user
 
 # (옵션) LLM 라우터가 없으면 자동 폴백
 try:
-    from ..services.llm_router import llm_route  # Gemini/OpenAI 등
+    from ..services.llm_router import stats as llm_stats  # Gemini/OpenAI 등
 except Exception:  # 파일이 없거나 의존성이 없을 때
-    async def llm_route(text: str):
-        return {"label": None, "reason": "llm_disabled"}
-
-# (옵션) DB 로깅이 없으면 폴백
-try:
-    from ..db import PredictionLog
-except Exception:
-    PredictionLog = None  # type: ignore
+    def llm_stats():
+        return {"disabled": True}
 
 router = APIRouter(prefix="/ml", tags=["ml"])
 
@@ -146,93 +146,92 @@ router = APIRouter(prefix="/ml", tags=["ml"])
 async def classify(
     body: ClassifyIn,
     cache=Depends(get_cache),
-    db: Session = Depends(get_db),
 ):
     text = body.text.strip()
-    key = f"classify:{text}"
-
-    # 캐시 읽기(실패 무시)
-    try:
-        cached = await cache.get(key)
-        if cached:
-            return ClassifyOut(**json.loads(cached))
-    except Exception as e:
-        print("cache get skipped:", e)
-
-    # 모델 예측
-    label, conf = predict(text)
-    ev = make_evidence(text, label)
+    # 활성 모델이 채점하는 입력 + 모델 버전 해시 키. 1차(프로세스 내) → 2차(Redis) 순으로 조회
+    key = classify_cache_key(text)
+
+    # 캐시 적중 시 저장된 응답 바이트를 그대로 반환(pydantic 재검증/재직렬화 생략)
+    with stage_latency.time("cache"):
+        cached = await classify_cache.get(cache, key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # 모델 예측(동시 요청은 마이크로 배치로 묶어 채점)
+    label, conf, version = await predict_async(text)
+    with stage_latency.time("rules"):
+        ev = make_evidence(text, label)
     out = ClassifyOut(
         type=label,
         department_id=label_to_department(label),
         confidence=conf,
         evidence=Evidence(keywords=ev),
+        model_version=version,
     )
 
     # 캐시 쓰기(실패 무시)
-    try:
-        await cache.set(key, out.model_dump_json(), ex=300)
-    except Exception as e:
-        print("cache set skipped:", e)
+    raw = out.model_dump_json().encode("utf-8")
+    await classify_cache.set(cache, key, raw)
 
-    # DB 로깅(선택)
-    if PredictionLog is not None:
-        try:
-            db.add(PredictionLog(text=text, predicted_label=out.type, confidence=str(out.confidence)))
-            db.commit()
-        except Exception as e:
-            print("db log failed:", e)
-            db.rollback()
+    # 예측 로그: 버퍼에 넣기만 하고 저장은 백그라운드 bulk insert
+    prediction_logger.log(text, out.type, out.confidence, version)
 
-    return out
+    return Response(content=raw, media_type="application/json")
+
+
+@router.post("/classify/batch", response_model=List[ClassifyOut])
+async def classify_batch(body: ClassifyBatchIn):
+    # 야간 재분류/백필용: 한 번의 벡터화 호출로 전체를 채점, 입력 순서대로 반환
+    texts = [t.strip() for t in body.texts]
+    with inference.inference_slot():
+        results = await inference.run_inference(predict_batch, texts, active_version())
+    return [
+        ClassifyOut(
+            type=label,
+            department_id=label_to_department(label),
+            confidence=conf,
+            evidence=Evidence(keywords=make_evidence(text, label)),
+            model_version=version,
+        )
+        for text, (label, conf, version) in zip(texts, results)
+    ]
 
 
 @router.post("/route", response_model=RouteOut)
 async def route(
     body: ClassifyIn,
     force_llm: bool = Query(False, description="테스트용: LLM을 강제로 한 번 시도"),
+    budget_ms: Optional[float] = Header(None, alias="X-Request-Budget-Ms"),
 ):
-    # 1차: 모델 예측
-    label, conf = predict(body.text)
+    # 단계 순서/임계값/예산은 CASCADE_CONFIG로 설정(기본: 모델 → 키워드 룰 → LLM)
+    return await cascade.run_cascade(body.text, budget_ms, force_llm)
 
-    # 2차: 임계값 미만이거나 강제 호출이면 → 키워드 룰 → LLM 순으로 보강
-    if conf < THRESHOLD or force_llm:
-        # (옵션) 키워드 룰: 강제 호출 중엔 생략하고 바로 LLM 시도하고 싶다면 아래 if를 주석 처리
-        rule = apply_keyword_rules(body.text)
-        if rule and rule != label and not force_llm:
-            alt = ClassifyOut(
-                type=rule,
-                department_id=label_to_department(rule),
-                confidence=0.51,
-                evidence=Evidence(keywords=[], rule_matched="keyword"),
-            )
-            return RouteOut(routed_to="human_triage", reason=f"low confidence {conf:.2f}", original=alt)
 
-        # LLM 시도(항상 한 번 실행)
-        try:
-            lr = await llm_route(body.text)
-        except Exception as e:
-            lr = {"label": None, "reason": f"llm_error:{type(e).__name__}"}
+@router.get("/metrics")
+async def metrics():
+    # 활성 버전의 metrics.json(버전별로 한 번만 읽음). Prometheus 지표는 /metrics
+    version = active_version() or registry.read_active()
+    m = registry.read_metrics(version) if version else None
+    return {**m, "model_version": version} if m is not None else {"detail": "metrics not found"}
 
-        print("LLM route →", lr)  # 콘솔 진단용
 
-        if lr.get("label"):
-            alt = ClassifyOut(
-                type=lr["label"],
-                department_id=label_to_department(lr["label"]),
-                confidence=0.60,
-                evidence=Evidence(keywords=[], rule_matched="llm"),
-            )
-            return RouteOut(routed_to="human_triage", reason=f"llm:{lr.get('reason','ok')}", original=alt)
+@router.get("/models", response_model=ModelVersionsOut)
+async def list_models(user=Depends(get_current_user)):
+    return ModelVersionsOut(active=active_version(), versions=registry.list_versions())
 
-        # LLM 실패 → 실패 사유를 reason에 그대로 노출
-        return RouteOut(routed_to="llm_router", reason=f"llm:{lr.get('reason','unknown')}", original=None)
 
-    # 신뢰도 충분 → 알파 단계 수동 검토
-    return RouteOut(routed_to="human_triage", reason="alpha stage manual check", original=None)
+@router.post("/models/{version}/activate", response_model=ModelVersionsOut)
+async def activate_model(version: str, user=Depends(get_current_user)):
+    # 로드/워밍업은 스레드에서 → 교체 직전까지 기존 버전으로 계속 서비스
+    if not registry.is_complete(version):
+        raise HTTPException(status_code=404, detail=f"model version not found: {version}")
+    await asyncio.to_thread(activate, version)
+    return ModelVersionsOut(active=active_version(), versions=registry.list_versions())
 
 
-@router.get("/metrics")
-async def metrics():
-    p = Path(__file__).resolve().parents[2] / "models" / "metrics.json"
-    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {"detail": "metrics not found"}
+@router.get("/stats")
+async def stats():
+    # 런타임 카운터(마이크로 배치 크기 분포, 추론 대기열, 캐시 적중률 등)
+    return {"batcher": model_batcher.stats(), "inference": inference.stats(),
+            "classify_cache": classify_cache.stats(), "prediction_log": prediction_logger.stats(),
+            "llm": llm_stats(), "cascade": cascade.stats()}
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Literal
 
 Classes = Literal["시설","환경","전산","기타"]
@@ -7,20 +7,37 @@ Classes = Literal["시설","환경","전산","기타"]
 class ClassifyIn(BaseModel):
     text: str
 
+class ClassifyBatchIn(BaseModel):
+    texts: List[str] = Field(min_length=1, max_length=5000)
+
 class Evidence(BaseModel):
     keywords: List[str] = []
     rule_matched: Optional[str] = None
 
 class ClassifyOut(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())  # model_version 필드 허용
     type: Classes
     department_id: int
     confidence: float = Field(ge=0.0, le=1.0)
     evidence: Evidence
+    model_version: Optional[str] = None
+
+class StageTrace(BaseModel):
+    stage: str
+    outcome: Literal["accepted","passed","miss","skipped","error"]
+    ms: float
+    label: Optional[str] = None
+    confidence: Optional[float] = None
 
 class RouteOut(BaseModel):
     routed_to: Literal["llm_router","human_triage"]
     reason: str
     original: Optional[ClassifyOut] = None
+    stages: List[StageTrace] = []  # 실행된 캐스케이드 단계와 소요 시간
+
+class ModelVersionsOut(BaseModel):
+    active: Optional[str] = None
+    versions: List[str] = []
 
 class LoginIn(BaseModel):
     username: str
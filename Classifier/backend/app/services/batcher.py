@@ -0,0 +1,136 @@
+
+import os, time, asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from .model import Prediction, active_version, predict_batch
+from .inference import INFER_CONCURRENCY, inference_slot, run_inference
+from .metrics import stage_latency
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 단건 요청을 모아 한 번에 처리하는 스케줄러.
+    max_size개가 모이거나 첫 요청 후 max_wait_ms가 지나면(먼저 오는 쪽) fn(batch)를 한 번 호출하고,
+    결과를 기다리던 코루틴들에게 입력 순서대로 돌려준다.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 concurrency: int = 1):
+        self.fn = fn
+        self.max_size = max(1, max_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.concurrency = max(1, concurrency)  # 동시에 처리 중일 수 있는 배치 수
+        self.batch_sizes: Counter = Counter()  # 배치 크기 -> 횟수
+        self.items = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: set = set()
+        self._loop = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            # 이벤트 루프가 바뀌면(테스트/재시작) 큐와 워커를 새로 만든다
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._task = loop.create_task(self._worker())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_started()
+        fut = self._loop.create_future()
+        self._queue.put_nowait((item, fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_size:
+            # 이미 쌓여 있는 건 기다리지 않고 바로 가져감
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            # 처리 슬롯이 빌 때까지 기다리는 동안 큐에 요청이 더 쌓여 다음 배치가 커진다
+            await self._slots.acquire()
+            batch = await self._collect()
+            live = [(it, f) for it, f in batch if not f.done()]  # 취소된 요청은 제외
+            if not live:
+                self._slots.release()
+                continue
+            self.batch_sizes[len(live)] += 1
+            self.items += len(live)
+            t = self._loop.create_task(self._dispatch(live))
+            self._inflight.add(t)
+            t.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, live: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.fn([it for it, _ in live])
+        except Exception as e:
+            for _, f in live:
+                if not f.done():
+                    f.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (_, f), r in zip(live, results):
+            if not f.done():
+                f.set_result(r)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        return {
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "batches": batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / batches) if batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size_counts": dict(sorted(self.batch_sizes.items())),
+        }
+
+
+async def _score(texts: List[str]) -> List[Prediction]:
+    # 배치 단위로 활성 버전을 고정 → 배치 도중 핫 리로드가 일어나도 한 버전으로 채점
+    t0 = time.perf_counter()
+    try:
+        return await run_inference(predict_batch, texts, active_version())
+    finally:
+        stage_latency.observe(time.perf_counter() - t0, "predict")
+
+model_batcher = MicroBatcher(_score, concurrency=INFER_CONCURRENCY)
+
+async def predict_async(text: str) -> Prediction:
+    """
+    단건 예측을 마이크로 배처에 태운다(동시 요청은 한 번의 decision_function으로 채점).
+    대기열이 가득 차면 InferenceOverloaded를 던진다.
+    """
+    with inference_slot():
+        return await model_batcher.submit(text)
@@ -0,0 +1,53 @@
+
+import time
+from typing import Optional
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번 쌓이면 open → reset_timeout 동안 호출을 건너뜀(short-circuit).
+    시간이 지나면 half_open으로 probe 한 건만 통과시켜, 성공하면 closed / 실패하면 다시 open.
+    이벤트 루프 단일 스레드에서 사용한다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0          # 연속 실패 수
+        self.trips = 0             # closed/half_open → open 전환 횟수
+        self.short_circuits = 0    # open이라 건너뛴 호출 수
+        self._opened_at: Optional[float] = None
+        self._probe_inflight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_inflight = False
+        if self.state == self.HALF_OPEN and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        self.short_circuits += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+        self._probe_inflight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_inflight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips,
+                "short_circuits": self.short_circuits}
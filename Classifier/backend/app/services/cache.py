@@ -0,0 +1,107 @@
+
+import os, time, hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .normalize import normalize_text
+
+CLASSIFY_CACHE_TTL = int(os.getenv("CLASSIFY_CACHE_TTL", "300"))   # Redis(2차) TTL(초)
+CLASSIFY_L1_SIZE = int(os.getenv("CLASSIFY_L1_SIZE", "10000"))     # 프로세스 내(1차) 최대 항목 수
+CLASSIFY_L1_TTL = float(os.getenv("CLASSIFY_L1_TTL", "60"))        # 프로세스 내(1차) TTL(초)
+
+
+def hash_key(prefix: str, text: str, version: Optional[str]) -> str:
+    """본문(호출 쪽에서 이미 정규화한 그대로) + 버전의 해시."""
+    h = hashlib.blake2b(f"{version or '-'}\0{text}".encode("utf-8"), digest_size=16)
+    return f"{prefix}:{h.hexdigest()}"
+
+
+def cache_key(prefix: str, text: str, version: Optional[str]) -> str:
+    """normalize_text한 본문 + 버전의 해시. 띄어쓰기·문장부호·불용어만 다른 민원은 같은 키."""
+    return hash_key(prefix, normalize_text(text), version)
+
+
+class TTLCache:
+    """프로세스 내 LRU + TTL 캐시(이벤트 루프 단일 스레드에서 사용)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "hit_ratio": (self.hits / total) if total else 0.0}
+
+
+class TwoTierCache:
+    """1차: 프로세스 내 TTLCache, 2차: Redis. 값은 직렬화된 응답 바이트를 그대로 저장한다."""
+
+    def __init__(self, prefix: str, l1: TTLCache, ttl: int):
+        self.prefix = prefix
+        self.l1 = l1
+        self.ttl = ttl
+        self.l2_hits = 0
+        self.l2_misses = 0
+
+    def key(self, text: str, version: Optional[str]) -> str:
+        # text는 그 버전의 모델이 실제로 채점하는 입력(model.classify_cache_key 참고). 여기서 다시 정규화하지 않는다
+        return hash_key(self.prefix, text, version)
+
+    async def get(self, redis, key: str) -> Optional[bytes]:
+        raw = self.l1.get(key)
+        if raw is not None:
+            return raw
+        # Redis 미가동이어도 에러 없이 지나가도록
+        try:
+            raw = await redis.get(key)
+        except Exception as e:
+            print("cache get skipped:", e)
+            return None
+        if not raw:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        raw = raw.encode("utf-8") if isinstance(raw, str) else raw
+        self.l1.set(key, raw)
+        return raw
+
+    async def set(self, redis, key: str, raw: bytes):
+        self.l1.set(key, raw)
+        try:
+            await redis.set(key, raw, ex=self.ttl)
+        except Exception as e:
+            print("cache set skipped:", e)
+
+    def stats(self) -> dict:
+        total = self.l2_hits + self.l2_misses
+        return {"l1": self.l1.stats(), "l2_hits": self.l2_hits, "l2_misses": self.l2_misses,
+                "l2_hit_ratio": (self.l2_hits / total) if total else 0.0}
+
+
+classify_cache = TwoTierCache("classify", TTLCache(CLASSIFY_L1_SIZE, CLASSIFY_L1_TTL), CLASSIFY_CACHE_TTL)
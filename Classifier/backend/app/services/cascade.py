@@ -0,0 +1,226 @@
+
+import os, json, time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from ..schemas import ClassifyOut, Evidence, RouteOut, StageTrace
+from .batcher import predict_async
+from .cache import classify_cache
+from .inference import InferenceOverloaded
+from .knn import nearest
+from .metrics import stage_latency
+from .model import classify_cache_key, label_to_department, make_evidence
+from .rules import THRESHOLD, match_rules
+from ..deps import redis_client
+
+# (옵션) LLM 라우터가 없으면 자동 폴백
+try:
+    from .llm_router import llm_route  # Gemini/OpenAI 등
+except Exception:  # 파일이 없거나 의존성이 없을 때
+    async def llm_route(text: str, timeout=None):
+        return {"label": None, "reason": "llm_disabled"}
+
+# /route 요청 하나에 쓸 수 있는 전체 시간(ms). X-Request-Budget-Ms 헤더로 요청별 지정 가능
+ROUTE_BUDGET_MS = float(os.getenv("ROUTE_BUDGET_MS", "8000"))
+# 남은 예산이 이보다 적으면 LLM 단계를 건너뜀(어차피 제시간에 못 끝남)
+LLM_MIN_BUDGET_MS = float(os.getenv("LLM_MIN_BUDGET_MS", "300"))
+# 캐스케이드 설정: JSON 문자열 또는 JSON 파일 경로. 없으면 DEFAULT_CASCADE(기존 /route 동작과 동일)
+CASCADE_CONFIG = os.getenv("CASCADE_CONFIG", "")
+
+# 단계 설정 키
+#   stage      : cache | rules | model | knn | llm
+#   threshold  : 결과 신뢰도가 이 이상이면 채택 후보(기본 0)
+#   policy     : accept(채택 후보면 종료) | disagree(모델과 라벨이 다를 때만 종료) | never(기록만 하고 계속)
+#   cost_ms    : 남은 예산이 이보다 적으면 건너뜀
+#   confidence : 자체 점수가 없는 단계(rules, llm)의 신뢰도
+#   routed_to / reason / original : 채택 시 RouteOut. reason은 {model_conf}, {reason} 치환
+#   enabled    : false면 건너뜀
+DEFAULT_CASCADE: Dict[str, Any] = {
+    "stages": [
+        {"stage": "model", "threshold": THRESHOLD, "reason": "alpha stage manual check", "original": False},
+        {"stage": "rules", "policy": "disagree", "confidence": 0.51, "reason": "low confidence {model_conf:.2f}"},
+        {"stage": "llm", "confidence": 0.60, "cost_ms": LLM_MIN_BUDGET_MS, "reason": "llm:{reason}"},
+    ],
+    # 어느 단계도 채택하지 않으면(마지막 단계의 실패 사유를 노출)
+    "fallback": {"routed_to": "llm_router", "reason": "llm:{reason}"},
+}
+
+
+class StageResult(NamedTuple):
+    label: str
+    confidence: float
+    reason: str
+    evidence: Optional[List[str]] = None  # None이면 출력할 때 룰 사전에서 근거 키워드를 찾음
+    rule_matched: Optional[str] = None
+
+
+class RouteContext:
+    def __init__(self, text: str, budget: float, force_llm: bool):
+        self.text = text
+        self.started = time.monotonic()
+        self.budget = budget
+        self.force_llm = force_llm
+        self.model: Optional[tuple] = None  # (label, confidence, version) — cache/model 단계가 채움
+        self.reason = "unknown"             # 마지막 단계의 결과/실패 사유
+
+    def remaining(self) -> float:
+        return self.budget - (time.monotonic() - self.started)
+
+    @property
+    def model_conf(self) -> float:
+        return self.model[1] if self.model else 0.0
+
+
+async def _stage_cache(ctx: RouteContext, spec: dict) -> Optional[StageResult]:
+    # /classify가 남긴 모델 결과(같은 모델 버전)를 재사용 → 뒤의 model 단계는 추론을 생략
+    raw = await classify_cache.get(redis_client, classify_cache_key(ctx.text.strip()))
+    if raw is None:
+        ctx.reason = "cache_miss"
+        return None
+    out = ClassifyOut.model_validate_json(raw)
+    ctx.model = (out.type, out.confidence, out.model_version)
+    ctx.reason = "cache_hit"
+    return StageResult(out.type, out.confidence, "cache_hit", out.evidence.keywords)
+
+
+async def _stage_model(ctx: RouteContext, spec: dict) -> Optional[StageResult]:
+    if ctx.model is None:
+        ctx.model = tuple(await predict_async(ctx.text))
+    label, conf, _ = ctx.model
+    ctx.reason = "model"
+    return StageResult(label, conf, "model")
+
+
+async def _stage_rules(ctx: RouteContext, spec: dict) -> Optional[StageResult]:
+    rm = match_rules(ctx.text)  # 룰 사전을 한 번만 훑어 라벨·근거 키워드를 같이 얻음
+    if rm.best is None:
+        ctx.reason = "no_rule_match"
+        return None
+    ctx.reason = "keyword"
+    return StageResult(rm.best, spec.get("confidence", 0.51), "keyword", rm.evidence.get(rm.best, []), "keyword")
+
+
+async def _stage_knn(ctx: RouteContext, spec: dict) -> Optional[StageResult]:
+    hit = nearest(ctx.text)
+    if hit is None:
+        ctx.reason = "knn_no_neighbour"
+        return None
+    ctx.reason = "knn"
+    return StageResult(hit[0], hit[1], "knn", None, "knn")
+
+
+async def _stage_llm(ctx: RouteContext, spec: dict) -> Optional[StageResult]:
+    try:
+        lr = await llm_route(ctx.text, timeout=ctx.remaining())
+    except Exception as e:
+        lr = {"label": None, "reason": f"llm_error:{type(e).__name__}"}
+    print("LLM route →", lr)  # 콘솔 진단용
+    ctx.reason = lr.get("reason") or "unknown"
+    if not lr.get("label"):
+        return None
+    return StageResult(lr["label"], spec.get("confidence", 0.60), ctx.reason, [], "llm")
+
+
+STAGES: Dict[str, Callable[[RouteContext, dict], Awaitable[Optional[StageResult]]]] = {
+    "cache": _stage_cache,
+    "rules": _stage_rules,
+    "model": _stage_model,
+    "knn": _stage_knn,
+    "llm": _stage_llm,
+}
+POLICIES = ("accept", "disagree", "never")
+
+
+def load_config(raw: str = CASCADE_CONFIG) -> Dict[str, Any]:
+    if not raw:
+        return DEFAULT_CASCADE
+    text = raw if raw.lstrip()[:1] in ("{", "[") else open(raw, encoding="utf-8").read()
+    cfg = json.loads(text)
+    if isinstance(cfg, list):
+        cfg = {"stages": cfg}
+    cfg.setdefault("fallback", DEFAULT_CASCADE["fallback"])
+    for spec in cfg["stages"]:
+        if spec.get("stage") not in STAGES:
+            raise ValueError(f"unknown cascade stage: {spec.get('stage')}")
+        if spec.get("policy", "accept") not in POLICIES:
+            raise ValueError(f"unknown cascade policy: {spec.get('policy')}")
+    return cfg
+
+
+_config = load_config()
+_counts: Dict[str, Dict[str, int]] = {}   # 단계 -> 결과별 횟수
+_time_ms: Dict[str, float] = {}           # 단계 -> 누적 소요(ms)
+
+
+def _accepts(ctx: RouteContext, spec: dict, res: StageResult) -> bool:
+    if ctx.force_llm and spec["stage"] != "llm":  # 테스트용: LLM까지 강제로 내려감
+        return False
+    policy = spec.get("policy", "accept")
+    if policy == "never" or res.confidence < spec.get("threshold", 0.0):
+        return False
+    if policy == "disagree":
+        return ctx.model is None or res.label != ctx.model[0]
+    return True
+
+
+def _route_out(ctx: RouteContext, spec: dict, res: StageResult, trace: List[StageTrace]) -> RouteOut:
+    original = None
+    if spec.get("original", True):
+        original = ClassifyOut(
+            type=res.label,
+            department_id=label_to_department(res.label),
+            confidence=res.confidence,
+            evidence=Evidence(keywords=make_evidence(ctx.text, res.label) if res.evidence is None else res.evidence,
+                              rule_matched=res.rule_matched),
+            model_version=ctx.model[2] if ctx.model else None,
+        )
+    reason = spec.get("reason", "{reason}").format(model_conf=ctx.model_conf, reason=res.reason)
+    return RouteOut(routed_to=spec.get("routed_to", "human_triage"), reason=reason, original=original, stages=trace)
+
+
+def _record(trace: List[StageTrace], stage: str, outcome: str, started: float, res: Optional[StageResult] = None):
+    ms = (time.monotonic() - started) * 1000
+    trace.append(StageTrace(stage=stage, outcome=outcome, ms=round(ms, 3),
+                            label=res.label if res else None, confidence=res.confidence if res else None))
+    c = _counts.setdefault(stage, {})
+    c[outcome] = c.get(outcome, 0) + 1
+    _time_ms[stage] = _time_ms.get(stage, 0.0) + ms
+    stage_latency.observe(ms / 1000, stage)
+
+
+async def run_cascade(text: str, budget_ms: Optional[float] = None, force_llm: bool = False) -> RouteOut:
+    """설정된 순서대로 단계를 실행하고, 처음으로 채택된 단계의 결과로 RouteOut을 만든다."""
+    ctx = RouteContext(text, (budget_ms if budget_ms and budget_ms > 0 else ROUTE_BUDGET_MS) / 1000, force_llm)
+    trace: List[StageTrace] = []
+    for spec in _config["stages"]:
+        name = spec["stage"]
+        if not spec.get("enabled", True):
+            continue
+        t0 = time.monotonic()
+        if ctx.remaining() * 1000 < spec.get("cost_ms", 0):
+            ctx.reason = f"{name}_budget_exhausted"
+            _record(trace, name, "skipped", t0)
+            continue
+        try:
+            res = await STAGES[name](ctx, spec)
+        except InferenceOverloaded:
+            raise  # 과부하 503은 그대로 올려보냄
+        except Exception as e:
+            # 단계 하나가 실패해도 다음 단계로(예: 색인 파일 손상)
+            ctx.reason = f"{name}_error:{type(e).__name__}"
+            _record(trace, name, "error", t0)
+            continue
+        if res is None:
+            _record(trace, name, "miss", t0)
+            continue
+        if _accepts(ctx, spec, res):
+            _record(trace, name, "accepted", t0, res)
+            return _route_out(ctx, spec, res, trace)
+        _record(trace, name, "passed", t0, res)
+    fb = _config["fallback"]
+    reason = fb.get("reason", "{reason}").format(model_conf=ctx.model_conf, reason=ctx.reason)
+    return RouteOut(routed_to=fb.get("routed_to", "llm_router"), reason=reason, original=None, stages=trace)
+
+
+def stats() -> dict:
+    return {"stages": [s["stage"] for s in _config["stages"] if s.get("enabled", True)],
+            "counts": _counts, "time_ms": {k: round(v, 3) for k, v in _time_ms.items()}}
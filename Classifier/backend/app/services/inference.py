@@ -0,0 +1,85 @@
+
+import os, gc, asyncio
+import multiprocessing as mp
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+INFER_CONCURRENCY = int(os.getenv("INFER_CONCURRENCY", "2"))   # 동시에 실행되는 추론 작업 수
+INFER_QUEUE_MAX = int(os.getenv("INFER_QUEUE_MAX", "256"))     # 대기+실행 중인 요청 상한
+INFER_RETRY_AFTER = int(os.getenv("INFER_RETRY_AFTER", "1"))   # 503 응답의 Retry-After(초)
+INFER_MODE = os.getenv("INFER_MODE", "thread")                 # thread | process
+
+_executor: Optional[Executor] = None
+_pending = 0
+_rejected = 0
+
+
+class InferenceOverloaded(Exception):
+    """추론 대기열이 가득 찼을 때. 핸들러에서 503 + Retry-After로 변환된다."""
+
+    def __init__(self, retry_after: int = INFER_RETRY_AFTER):
+        super().__init__("inference queue full")
+        self.retry_after = retry_after
+
+
+@contextmanager
+def inference_slot():
+    """요청 하나가 추론을 기다리는 동안 대기열 자리를 점유. 꽉 차 있으면 즉시 실패(fail fast)."""
+    global _pending, _rejected
+    if _pending >= INFER_QUEUE_MAX:
+        _rejected += 1
+        raise InferenceOverloaded()
+    _pending += 1
+    try:
+        yield
+    finally:
+        _pending -= 1
+
+
+def _make_executor() -> Executor:
+    workers = max(1, INFER_CONCURRENCY)
+    if INFER_MODE != "process":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="infer")
+    # 프로세스 모드: 부모에서 모델을 한 번 로드(mmap)한 뒤 fork → 워커들이 같은 메모리를 읽기 전용으로 공유.
+    # gc.freeze()로 기존 객체를 GC 추적에서 빼서, GC가 공유 페이지를 건드려 복사(CoW)되는 것을 줄인다.
+    from .model import load_model
+    try:
+        load_model()
+    except Exception as e:
+        print("model preload for process pool failed:", e)
+    gc.freeze()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("fork"))
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = _make_executor()
+    return _executor
+
+
+async def run_inference(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    CPU 바운드 추론을 전용 실행기(스레드 또는 프로세스 풀)에서 돌려 이벤트 루프(/health 등)를 막지 않는다.
+    프로세스 모드에서는 fn/args가 pickle 가능해야 한다(모듈 최상위 함수).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), fn, *args)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def stats() -> dict:
+    return {
+        "mode": INFER_MODE,
+        "concurrency": INFER_CONCURRENCY,
+        "queue_max": INFER_QUEUE_MAX,
+        "pending": _pending,
+        "rejected": _rejected,
+    }
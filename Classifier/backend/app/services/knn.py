@@ -0,0 +1,79 @@
+
+import os, csv, math, threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .normalize import normalize_text
+
+# 라벨이 붙은 민원(text,label CSV). 이미 처리된 민원과 거의 같은 문장이면 모델/LLM 없이 같은 라벨로 보낸다
+KNN_PATH = os.getenv("KNN_PATH", str(Path(__file__).resolve().parents[2] / "ml" / "dataset.csv"))
+KNN_NGRAM = int(os.getenv("KNN_NGRAM", "2"))
+
+
+def _grams(text: str, n: int = KNN_NGRAM) -> Set[str]:
+    t = normalize_text(text).replace(" ", "")
+    return {t[i:i + n] for i in range(len(t) - n + 1)} if len(t) >= n else ({t} if t else set())
+
+
+class NeighbourIndex:
+    """문자 n-gram 집합의 코사인 유사도로 가장 가까운 라벨 문장을 찾는 역색인(후보는 n-gram을 공유하는 문장만)."""
+
+    def __init__(self, rows: List[Tuple[str, str]]):
+        self.labels: List[str] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        for text, label in rows:
+            grams = _grams(text)
+            if not grams:
+                continue
+            doc = len(self.labels)
+            self.labels.append(label)
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(doc)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def nearest(self, text: str) -> Optional[Tuple[str, float]]:
+        """(라벨, 유사도 0~1). 공유 n-gram이 하나도 없으면 None."""
+        grams = _grams(text)
+        if not grams:
+            return None
+        shared: Counter = Counter()
+        for g in grams:
+            shared.update(self.postings.get(g, ()))
+        if not shared:
+            return None
+        q = len(grams)
+        doc, score = max(((d, c / math.sqrt(q * self.sizes[d])) for d, c in shared.items()), key=lambda x: x[1])
+        return self.labels[doc], score
+
+
+_index: Optional[NeighbourIndex] = None
+_lock = threading.Lock()
+
+
+def _load(path: str) -> NeighbourIndex:
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = [(r["text"], r["label"]) for r in csv.DictReader(l for l in f if l.strip())
+                if r.get("text") and r.get("label")]
+    return NeighbourIndex(rows)
+
+
+def get_index() -> NeighbourIndex:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                try:
+                    _index = _load(KNN_PATH)
+                except Exception as e:
+                    print("knn index load failed:", e)
+                    _index = NeighbourIndex([])
+    return _index
+
+
+def nearest(text: str) -> Optional[Tuple[str, float]]:
+    return get_index().nearest(text)
@@ -1,124 +1,401 @@
-import os, re, json
-from typing import Dict, Any, Optional, List
-import requests
-
-Labels = ["시설", "환경", "전산", "기타"]
-
-def _extract_json(text: str) -> Optional[dict]:
-    for m in re.finditer(r"\{.*\}", text, flags=re.S):
-        try:
-            return json.loads(m.group(0))
-        except Exception:
-            pass
-    return None
-
-# ---- 핵심: 사용 가능한 모델/버전을 동적으로 탐색 ----
-def _list_models(api_key: str) -> Dict[str, Any]:
-    """
-    v1 -> 실패 시 v1beta 순으로 모델 목록을 조회.
-    반환: {"api_version": "v1"|"v1beta", "models": [모델명 문자열 리스트]}
-    """
-    bases = [("v1", "https://generativelanguage.googleapis.com/v1/models"),
-             ("v1beta", "https://generativelanguage.googleapis.com/v1beta/models")]
-
-    for ver, url in bases:
-        try:
-            r = requests.get(f"{url}?key={api_key}", timeout=10)
-            if r.ok:
-                data = r.json()
-                names = [m.get("name") for m in data.get("models", []) if "name" in m]
-                if names:
-                    return {"api_version": ver, "models": names}
-                # ok인데 리스트가 비면 계속 다음 버전 시도
-            else:
-                # 디버그용 로그
-                print(f"[ListModels {ver}] HTTP {r.status_code} - {r.text[:200]}")
-        except Exception as e:
-            print(f"[ListModels {ver} Exception] {type(e).__name__}: {e}")
-    return {"api_version": None, "models": []}
-
-def _choose_model(available: List[str]) -> Optional[str]:
-    """
-    선호도 순으로 텍스트 생성 가능한 모델을 고름.
-    available에는 'models/...' 형태로 이름이 들어있음.
-    """
-    # 선호도(상황에 따라 여기 순서만 바꿔도 됨)
-    preferred = [
-        "models/gemini-pro",                # 가장 호환 잘됨 (많은 계정에서 열려있음)
-        "models/gemini-1.5-flash-latest",
-        "models/gemini-1.5-flash",
-        "models/gemini-1.5-pro",
-        "models/gemini-1.0-pro"
-    ]
-    # available에 실제로 존재하는 첫 후보를 선택
-    for p in preferred:
-        if p in available:
-            return p
-    # 위 후보가 하나도 없으면, 이름에 'gemini'가 있고 generateContent 가능한 것으로 보이는 것 아무거나
-    for name in available:
-        if "models/gemini" in name and "embedding" not in name.lower():
-            return name
-    return None
-
-async def llm_route(text: str) -> Dict[str, Any]:
-    gkey = os.getenv("GEMINI_API_KEY")
-    if not gkey:
-        print("[LLM Router] ❌ GEMINI_API_KEY 없음")
-        return {"label": None, "reason": "no_llm_key"}
-
-    # 1) 내 키로 어떤 모델/버전이 열려있는지 먼저 확인
-    probe = _list_models(gkey)
-    api_ver = probe["api_version"]
-    models = probe["models"]
-
-    if not api_ver or not models:
-        # 모델 목록도 못 가져오면 키/권한/네트워크 이슈
-        return {"label": None, "reason": "gemini_listmodels_failed"}
-
-    chosen = _choose_model(models)
-    if not chosen:
-        print("[Gemini] ❌ 사용 가능한 텍스트 생성 모델을 찾지 못했습니다.")
-        # 디버그: 사용 가능한 모델 나열
-        print("[Gemini] available models (truncated):", models[:10])
-        return {"label": None, "reason": "gemini_no_suitable_model"}
-
-    # 2) 선택한 모델로 generateContent 호출
-    try:
-        # chosen 예: "models/gemini-pro"
-        url = f"https://generativelanguage.googleapis.com/{api_ver}/{chosen}:generateContent?key={gkey}"
-
-        prompt = (
-            "다음 한국어 신고 문장을 읽고 가장 적절한 하나의 카테고리를 선택하세요.\n"
-            f"카테고리 후보: {', '.join(Labels)}\n"
-            "출력 형식(JSON): {\"label\":\"시설|환경|전산|기타\", \"reason\":\"...\"}\n"
-            f"문장: {text}\n"
-        )
-        data = {"contents": [{"parts": [{"text": prompt}]}]}
-
-        r = requests.post(url, json=data, timeout=20)
-        if not r.ok:
-            print(f"[Gemini Error] ❌ HTTP {r.status_code} - {r.text[:200]}")
-            return {"label": None, "reason": f"gemini_http_{r.status_code}"}
-
-        resp = r.json()
-        # 응답 스키마 수비적으로 접근
-        content = (
-            resp.get("candidates", [{}])[0]
-                .get("content", {})
-                .get("parts", [{}])[0]
-                .get("text", "")
-        )
-
-        parsed = _extract_json(content) or {}
-        if parsed.get("label") in Labels:
-            return {"label": parsed["label"], "reason": "gemini_ok"}
-
-        print("[Gemini Parse Error]", content)
-        return {"label": None, "reason": "gemini_parse_failed"}
-
-    except requests.exceptions.RequestException as e:
-        print(f"[Gemini Exception] {type(e).__name__}: {e}")
-        return {"label": None, "reason": f"gemini_error:{type(e).__name__}"}
-    except Exception as e:
-        print(f"[Gemini Unknown Error] {e}")
-        return {"label": None, "reason": f"gemini_error:{type(e).__name__}"}
+import os, re, json, time, asyncio
+from typing import Dict, Any, Optional, List
+import httpx
+
+from .batcher import MicroBatcher
+from .breaker import CircuitBreaker
+from .cache import TTLCache, TwoTierCache, cache_key
+from .metrics import stage_latency
+from ..deps import redis_client
+
+Labels = ["시설", "환경", "전산", "기타"]
+
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "20"))            # generateContent 호출 기본 데드라인
+LLM_CONNECT_TIMEOUT_SEC = float(os.getenv("LLM_CONNECT_TIMEOUT_SEC", "5"))
+LLM_DISCOVERY_TTL = float(os.getenv("LLM_DISCOVERY_TTL", "3600"))      # 모델/버전 탐색 결과 캐시(초)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))                # LLM 결과 Redis TTL(초)
+LLM_CACHE_L1_SIZE = int(os.getenv("LLM_CACHE_L1_SIZE", "2000"))
+LLM_CACHE_L1_TTL = float(os.getenv("LLM_CACHE_L1_TTL", "300"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))     # 연속 실패 몇 번에 브레이커 open
+LLM_BREAKER_RESET_SEC = float(os.getenv("LLM_BREAKER_RESET_SEC", "30"))  # open 유지 시간(이후 probe 1건)
+LLM_HEDGE_MS = float(os.getenv("LLM_HEDGE_MS", "0"))                     # 0이면 헤징 끔
+# 배치 모드: 동시에 LLM으로 가는 문장을 잠깐 모아 한 프롬프트(JSON 배열 응답)로 분류.
+# 호출 수/토큰이 줄어드는 대신 최대 LLM_BATCH_MAX_WAIT_MS만큼 대기가 붙는다(야간·재분류 작업용).
+LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "0") == "1"
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "200"))
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+PROMPT_VERSION = "v1"
+
+# 공유 비동기 클라이언트(커넥션 풀 + keep-alive). 이벤트 루프를 막지 않는다.
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT_SEC, connect=LLM_CONNECT_TIMEOUT_SEC),
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                max_keepalive_connections=LLM_MAX_CONNECTIONS, keepalive_expiry=60),
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _llm_batcher is not None:
+        await _llm_batcher.close()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _extract_json(text: str, array: bool = False) -> Optional[Any]:
+    """
+    응답 텍스트(코드펜스/설명 섞임)에서 JSON을 꺼낸다.
+    array=True면 JSON 배열만 받아들이고, 원소는 객체만 남긴다(배치 응답용).
+    """
+    pattern = r"\[.*\]" if array else r"\{.*\}"
+    for m in re.finditer(pattern, text, flags=re.S):
+        try:
+            data = json.loads(m.group(0))
+        except Exception:
+            continue
+        if not array:
+            return data
+        if isinstance(data, list):
+            return [d for d in data if isinstance(d, dict)]
+    return None
+
+# ---- 핵심: 사용 가능한 모델/버전을 동적으로 탐색 ----
+async def _list_models(api_key: str) -> Dict[str, Any]:
+    """
+    v1 -> 실패 시 v1beta 순으로 모델 목록을 조회.
+    반환: {"api_version": "v1"|"v1beta", "models": [모델명 문자열 리스트]}
+    """
+    client = _get_client()
+    for ver in ("v1", "v1beta"):
+        try:
+            r = await client.get(f"{GEMINI_BASE_URL}/{ver}/models", params={"key": api_key},
+                                 timeout=LLM_CONNECT_TIMEOUT_SEC * 2)
+            if r.is_success:
+                data = r.json()
+                names = [m.get("name") for m in data.get("models", []) if "name" in m]
+                if names:
+                    return {"api_version": ver, "models": names}
+                # ok인데 리스트가 비면 계속 다음 버전 시도
+            else:
+                # 디버그용 로그
+                print(f"[ListModels {ver}] HTTP {r.status_code} - {r.text[:200]}")
+        except Exception as e:
+            print(f"[ListModels {ver} Exception] {type(e).__name__}: {e}")
+    return {"api_version": None, "models": []}
+
+# 탐색 결과(api_version, 선택된 모델) 캐시: 요청마다 ListModels 왕복을 하지 않도록 TTL 동안 재사용
+_discovery: Optional[Dict[str, Any]] = None
+_discovery_lock: Optional[asyncio.Lock] = None
+
+def invalidate_discovery():
+    global _discovery
+    _discovery = None
+
+def _cached_discovery(api_key: str) -> Optional[Dict[str, Any]]:
+    d = _discovery
+    if d is not None and d["key"] == api_key and d["expires"] > time.monotonic():
+        return d
+    return None
+
+async def _discover(api_key: str) -> Dict[str, Any]:
+    """반환: {"api_version", "model", "reason"} — 실패 시 model=None, reason에 사유."""
+    global _discovery, _discovery_lock
+    d = _cached_discovery(api_key)
+    if d is not None:
+        return d
+    if _discovery_lock is None:
+        _discovery_lock = asyncio.Lock()
+    async with _discovery_lock:  # 동시에 만료돼도 탐색은 한 번만
+        d = _cached_discovery(api_key)
+        if d is not None:
+            return d
+        probe = await _list_models(api_key)
+        api_ver, models = probe["api_version"], probe["models"]
+        if not api_ver or not models:
+            # 모델 목록도 못 가져오면 키/권한/네트워크 이슈(실패는 캐시하지 않음)
+            return {"api_version": None, "model": None, "reason": "gemini_listmodels_failed"}
+        chosen = _choose_model(models)
+        if not chosen:
+            print("[Gemini] ❌ 사용 가능한 텍스트 생성 모델을 찾지 못했습니다.")
+            # 디버그: 사용 가능한 모델 나열
+            print("[Gemini] available models (truncated):", models[:10])
+            return {"api_version": api_ver, "model": None, "reason": "gemini_no_suitable_model"}
+        _discovery = {"key": api_key, "api_version": api_ver, "model": chosen, "reason": "ok",
+                      "expires": time.monotonic() + LLM_DISCOVERY_TTL}
+        return _discovery
+
+def _choose_model(available: List[str]) -> Optional[str]:
+    """
+    선호도 순으로 텍스트 생성 가능한 모델을 고름.
+    available에는 'models/...' 형태로 이름이 들어있음.
+    """
+    # 선호도(상황에 따라 여기 순서만 바꿔도 됨)
+    preferred = [
+        "models/gemini-pro",                # 가장 호환 잘됨 (많은 계정에서 열려있음)
+        "models/gemini-1.5-flash-latest",
+        "models/gemini-1.5-flash",
+        "models/gemini-1.5-pro",
+        "models/gemini-1.0-pro"
+    ]
+    # available에 실제로 존재하는 첫 후보를 선택
+    for p in preferred:
+        if p in available:
+            return p
+    # 위 후보가 하나도 없으면, 이름에 'gemini'가 있고 generateContent 가능한 것으로 보이는 것 아무거나
+    for name in available:
+        if "models/gemini" in name and "embedding" not in name.lower():
+            return name
+    return None
+
+async def _post(prompt: str, gkey: str, api_ver: str, chosen: str,
+                timeout: Optional[float]) -> Dict[str, Any]:
+    """generateContent 호출. 반환: {"content": 응답 텍스트} 또는 {"reason": 실패 사유}."""
+    try:
+        # chosen 예: "models/gemini-pro"
+        url = f"{GEMINI_BASE_URL}/{api_ver}/{chosen}:generateContent"
+        data = {"contents": [{"parts": [{"text": prompt}]}]}
+
+        with stage_latency.time("llm_call"):
+            r = await _get_client().post(url, params={"key": gkey}, json=data,
+                                         timeout=LLM_TIMEOUT_SEC if timeout is None else timeout)
+        if not r.is_success:
+            print(f"[Gemini Error] ❌ HTTP {r.status_code} - {r.text[:200]}")
+            if r.status_code == 404:
+                invalidate_discovery()  # 모델이 내려갔으면 다음 호출에서 다시 탐색
+            return {"reason": f"gemini_http_{r.status_code}"}
+
+        resp = r.json()
+        # 응답 스키마 수비적으로 접근
+        content = (
+            resp.get("candidates", [{}])[0]
+                .get("content", {})
+                .get("parts", [{}])[0]
+                .get("text", "")
+        )
+        return {"content": content}
+
+    except httpx.HTTPError as e:
+        print(f"[Gemini Exception] {type(e).__name__}: {e}")
+        return {"reason": f"gemini_error:{type(e).__name__}"}
+    except Exception as e:
+        print(f"[Gemini Unknown Error] {e}")
+        return {"reason": f"gemini_error:{type(e).__name__}"}
+
+async def _generate(text: str, gkey: str, api_ver: str, chosen: str, timeout: Optional[float]) -> Dict[str, Any]:
+    # 선택한 모델로 generateContent 호출
+    prompt = (
+        "다음 한국어 신고 문장을 읽고 가장 적절한 하나의 카테고리를 선택하세요.\n"
+        f"카테고리 후보: {', '.join(Labels)}\n"
+        "출력 형식(JSON): {\"label\":\"시설|환경|전산|기타\", \"reason\":\"...\"}\n"
+        f"문장: {text}\n"
+    )
+    r = await _post(prompt, gkey, api_ver, chosen, timeout)
+    if "content" not in r:
+        return {"label": None, "reason": r["reason"]}
+
+    parsed = _extract_json(r["content"]) or {}
+    if isinstance(parsed, dict) and parsed.get("label") in Labels:
+        return {"label": parsed["label"], "reason": "gemini_ok"}
+
+    print("[Gemini Parse Error]", r["content"])
+    return {"label": None, "reason": "gemini_parse_failed"}
+
+async def _generate_many(texts: List[str], gkey: str, api_ver: str, chosen: str,
+                         timeout: Optional[float]) -> List[Dict[str, Any]]:
+    """여러 문장을 한 프롬프트로 분류(입력 순서대로 반환). 응답에서 빠졌거나 잘못된 항목만 실패 처리."""
+    lines = "\n".join(f"[{i}] {' '.join(t.split())}" for i, t in enumerate(texts))
+    prompt = (
+        "다음 한국어 신고 문장들을 각각 읽고 가장 적절한 하나의 카테고리를 선택하세요.\n"
+        f"카테고리 후보: {', '.join(Labels)}\n"
+        "출력 형식(JSON 배열, 문장마다 하나): "
+        "[{\"id\":번호, \"label\":\"시설|환경|전산|기타\", \"reason\":\"...\"}]\n"
+        f"문장 목록:\n{lines}\n"
+    )
+    r = await _post(prompt, gkey, api_ver, chosen, timeout)
+    if "content" not in r:
+        return [{"label": None, "reason": r["reason"]}] * len(texts)
+
+    items = _extract_json(r["content"], array=True)
+    if items is None:
+        print("[Gemini Parse Error]", r["content"][:500])
+        return [{"label": None, "reason": "gemini_parse_failed"}] * len(texts)
+    out: List[Dict[str, Any]] = [{"label": None, "reason": "gemini_batch_missing"}] * len(texts)
+    for it in items:
+        i = it.get("id") if isinstance(it, dict) else None
+        if isinstance(i, str) and i.isdigit():
+            i = int(i)
+        if isinstance(i, int) and 0 <= i < len(texts) and it.get("label") in Labels:
+            out[i] = {"label": it["label"], "reason": "gemini_ok"}
+    return out
+
+# ---- 결과 캐시 + single-flight ----
+# 같은 장애를 여러 학생이 동시에 신고하면 거의 같은 문장이 몰려온다.
+# 키 = 정규화 본문 + 프롬프트 버전 + 모델. 프롬프트를 바꾸면 PROMPT_VERSION을 올릴 것.
+_llm_cache = TwoTierCache("llm", TTLCache(LLM_CACHE_L1_SIZE, LLM_CACHE_L1_TTL), LLM_CACHE_TTL)
+_inflight: Dict[str, asyncio.Task] = {}
+_collapsed = 0  # 진행 중인 동일 호출에 합류한 횟수
+
+# ---- 장애 격리: 서킷 브레이커 + 헤징 ----
+# Gemini가 느리거나 죽어 있으면 연속 실패 후 브레이커가 열려 LLM 단계를 바로 건너뛴다.
+_breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SEC)
+_hedges = 0       # 헤지 요청을 보낸 횟수
+_hedge_wins = 0   # 헤지 요청이 먼저 끝난 횟수
+
+def _is_failure(res: Dict[str, Any]) -> bool:
+    # 네트워크 오류/타임아웃, 5xx, 429만 upstream 장애로 본다(파싱 실패·4xx는 서비스는 살아 있음)
+    reason = res.get("reason", "")
+    if reason.startswith("gemini_error:"):
+        return True
+    if reason.startswith("gemini_http_"):
+        code = reason.rsplit("_", 1)[-1]
+        return code == "429" or code.startswith("5")
+    return False
+
+async def _hedged_generate(text: str, gkey: str, api_ver: str, chosen: str, timeout: float) -> Dict[str, Any]:
+    """LLM_HEDGE_MS 안에 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 끝난 쪽을 쓴다(최대 1회)."""
+    global _hedges, _hedge_wins
+    hedge_after = LLM_HEDGE_MS / 1000
+    first = asyncio.ensure_future(_generate(text, gkey, api_ver, chosen, timeout))
+    if LLM_HEDGE_MS <= 0 or hedge_after >= timeout:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+    _hedges += 1
+    second = asyncio.ensure_future(_generate(text, gkey, api_ver, chosen, timeout - hedge_after))
+    pending = {first, second}
+    res: Dict[str, Any] = {}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                res = t.result()
+                if res.get("label") or not _is_failure(res):
+                    if t is second:
+                        _hedge_wins += 1
+                    return res
+        return res  # 둘 다 실패하면 마지막 실패 사유
+    finally:
+        for t in pending:
+            t.cancel()
+
+def _error_result(e: Exception) -> Dict[str, Any]:
+    # 응답 스키마가 예상과 달라 파싱 중 터진 예외 등. 실패로 기록해야 half-open probe가 풀린다
+    print(f"[Gemini Unknown Error] {type(e).__name__}: {e}")
+    return {"label": None, "reason": f"gemini_error:{type(e).__name__}"}
+
+def _record(res: Dict[str, Any]):
+    if _is_failure(res):
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
+
+async def _route_batch(items: List[tuple]) -> List[Dict[str, Any]]:
+    # items: (text, gkey, api_ver, chosen). 보통 모델이 하나라 그룹도 하나
+    groups: Dict[tuple, List[int]] = {}
+    for i, (_, *target) in enumerate(items):
+        groups.setdefault(tuple(target), []).append(i)
+    out: List[Dict[str, Any]] = [{}] * len(items)
+    for (gkey, api_ver, chosen), idx in groups.items():
+        try:
+            if len(idx) == 1:
+                res = [await _hedged_generate(items[idx[0]][0], gkey, api_ver, chosen, LLM_TIMEOUT_SEC)]
+            else:
+                res = await _generate_many([items[i][0] for i in idx], gkey, api_ver, chosen, LLM_TIMEOUT_SEC)
+        except Exception as e:
+            res = [_error_result(e)] * len(idx)
+        _record(res[0])  # 호출 한 번 = 브레이커 기록 한 번(호출 실패면 모든 항목이 같은 사유)
+        for i, r in zip(idx, res):
+            out[i] = r
+    return out
+
+_llm_batcher = (MicroBatcher(_route_batch, LLM_BATCH_MAX_SIZE, LLM_BATCH_MAX_WAIT_MS, LLM_BATCH_CONCURRENCY)
+                if LLM_BATCH_ENABLED else None)
+
+async def _generate_and_cache(key: str, text: str, gkey: str, api_ver: str, chosen: str,
+                              timeout: float) -> Dict[str, Any]:
+    try:
+        if _llm_batcher is not None:
+            # 배치 호출은 자체 데드라인(LLM_TIMEOUT_SEC). 요청별 예산은 llm_route의 wait_for가 지킨다
+            res = await _llm_batcher.submit((text, gkey, api_ver, chosen))
+        else:
+            try:
+                res = await _hedged_generate(text, gkey, api_ver, chosen, timeout)
+            except Exception as e:
+                res = _error_result(e)
+            _record(res)
+        if res.get("label"):  # 성공한 결과만 캐시(실패는 다음 요청에서 재시도)
+            await _llm_cache.set(redis_client, key, json.dumps(res, ensure_ascii=False).encode("utf-8"))
+        return res
+    finally:
+        _inflight.pop(key, None)
+
+async def llm_route(text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    timeout: 이번 호출에 허용된 전체 시간(초, 모델 탐색 + generateContent). 없으면 LLM_TIMEOUT_SEC.
+    라우트 핸들러는 요청의 남은 데드라인 예산을 넘겨 LLM 단계가 예산을 넘지 않게 한다.
+    """
+    global _collapsed
+    gkey = os.getenv("GEMINI_API_KEY")
+    if not gkey:
+        print("[LLM Router] ❌ GEMINI_API_KEY 없음")
+        return {"label": None, "reason": "no_llm_key"}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (LLM_TIMEOUT_SEC if timeout is None else timeout)
+
+    # 1) 내 키로 어떤 모델/버전이 열려있는지 확인(TTL 캐시). 캐시가 없으면 탐색도 upstream 호출이라 브레이커 적용
+    found = _cached_discovery(gkey)
+    if found is None:
+        if not _breaker.allow():
+            return {"label": None, "reason": "llm_circuit_open"}
+        try:
+            found = await asyncio.wait_for(_discover(gkey), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            _breaker.record_failure()
+            return {"label": None, "reason": "gemini_error:Timeout"}
+        if found["reason"] == "gemini_listmodels_failed":
+            _breaker.record_failure()
+        else:
+            _breaker.record_success()
+    if not found["model"]:
+        return {"label": None, "reason": found["reason"]}
+    api_ver, chosen = found["api_version"], found["model"]
+
+    # 2) 결과 캐시(프로세스 내 → Redis) — 브레이커가 열려 있어도 캐시 적중은 그대로 응답
+    key = cache_key("llm", text, f"{PROMPT_VERSION}:{chosen}")
+    cached = await _llm_cache.get(redis_client, key)
+    if cached is not None:
+        return {**json.loads(cached), "cached": True}
+
+    remaining = deadline - loop.time()
+    if remaining <= 0:
+        return {"label": None, "reason": "llm_budget_exhausted"}
+
+    # 3) 동일 키의 동시 미스는 upstream 호출 하나로 합침. 호출은 별도 태스크라
+    #    먼저 온 요청이 끊겨도 기다리던 나머지는 결과를 받는다.
+    task = _inflight.get(key)
+    if task is None:
+        if not _breaker.allow():
+            return {"label": None, "reason": "llm_circuit_open"}
+        task = asyncio.ensure_future(_generate_and_cache(key, text, gkey, api_ver, chosen, remaining))
+        _inflight[key] = task
+    else:
+        _collapsed += 1
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), remaining)
+    except asyncio.TimeoutError:
+        return {"label": None, "reason": "gemini_error:Timeout"}
+
+def stats() -> dict:
+    return {"cache": _llm_cache.stats(), "inflight": len(_inflight), "collapsed": _collapsed,
+            "prompt_version": PROMPT_VERSION, "breaker": _breaker.stats(),
+            "hedges": _hedges, "hedge_wins": _hedge_wins,
+            "batcher": _llm_batcher.stats() if _llm_batcher is not None else None}
@@ -0,0 +1,164 @@
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Prometheus 텍스트 노출 형식(0.0.4)을 직접 만든다. 기록 경로는 dict 조회 + bisect + 덧셈 몇 번뿐이고
+# 이벤트 루프 단일 스레드에서 호출되므로 락이 없다. 큐 깊이·캐시 적중처럼 이미 다른 곳에서 세는 값은
+# 스크랩 시점에 콜백으로 읽는다.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 요청/단계 지연(초) 버킷: 0.5ms ~ 10s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labels
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for lv, v in self._values.items():
+            yield f"{self.name}{_fmt_labels(self.labelnames, lv)} {_num(v)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, list] = {}  # labels -> [버킷별 개수..., +Inf 개수, 합계]
+
+    def observe(self, value: float, *labels: str):
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect_left(self.buckets, value)] += 1  # 누적은 노출할 때 계산
+        s[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for lv, s in self._series.items():
+            acc = 0
+            for ub, c in zip(self.buckets + (float("inf"),), s):
+                acc += c
+                le = 'le="%s"' % ("+Inf" if ub == float("inf") else _num(ub))
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, lv, le)} {acc}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, lv)} {_num(s[-1])}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, lv)} {acc}"
+
+
+class _Timer:
+    __slots__ = ("h", "labels", "t0")
+
+    def __init__(self, h: Histogram, labels: Labels):
+        self.h, self.labels = h, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.h.observe(time.perf_counter() - self.t0, *self.labels)
+
+
+class Callback:
+    """스크랩할 때 fn()을 불러 {라벨 튜플: 값}을 그대로 노출(gauge 또는 이미 누적된 counter)."""
+
+    def __init__(self, name: str, help: str, kind: str, labels: Tuple[str, ...],
+                 fn: Callable[[], Dict[Labels, float]]):
+        self.name, self.help, self.kind, self.labelnames, self.fn = name, help, kind, labels, fn
+
+    def collect(self) -> Iterable[str]:
+        try:
+            values = self.fn()
+        except Exception as e:  # 스크랩 하나가 실패해도 나머지는 노출
+            print(f"metric {self.name} skipped:", e)
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for lv, v in values.items():
+            if v is not None:
+                yield f"{self.name}{_fmt_labels(self.labelnames, lv)} {_num(v)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, m):
+        self._metrics.append(m)
+        return m
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self.register(Counter(name, help, tuple(labels)))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, tuple(labels), buckets))
+
+    def callback(self, name, help, fn, labels=(), kind="gauge") -> Callback:
+        return self.register(Callback(name, help, kind, tuple(labels), fn))
+
+    def render(self) -> str:
+        return "\n".join(line for m in self._metrics for line in m.collect()) + "\n"
+
+
+registry = Registry()
+
+# 공용 지표(각 모듈은 여기서 가져다 기록만 한다)
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency by route",
+                                  ("method", "route", "status"))
+stage_latency = registry.histogram("classifier_stage_duration_seconds",
+                                   "Time spent per pipeline stage (cache, predict, rules, knn, llm, ...)", ("stage",))
+
+
+class MetricsMiddleware:
+    """라우트 템플릿(/ml/models/{version}/activate 등) 단위로 요청 지연을 기록하는 순수 ASGI 미들웨어."""
+
+    def __init__(self, app, skip: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            return await self.app(scope, receive, send)
+        status = ["500"]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            # 매칭 안 된 경로는 하나로 묶어 라벨 폭증 방지
+            path = getattr(route, "path", None) or "unmatched"
+            http_latency.observe(time.perf_counter() - t0, scope["method"], path, status[0])
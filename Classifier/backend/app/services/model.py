@@ -1,37 +1,221 @@
 
-import os, joblib, numpy as np
-from typing import Tuple
+import os, re, asyncio, threading, joblib, numpy as np
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from .rules import DEPT_MAP, evidence_keywords
+from . import normalize
+from . import registry
+from .cache import classify_cache
 
-MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(__file__),"..","..","models"))
-VEC_PATH  = os.path.join(MODEL_DIR,"tfidf.joblib")
-CLF_PATH  = os.path.join(MODEL_DIR,"svm.joblib")
+MODEL_DIR = str(registry.MODEL_DIR)
+# joblib 파일 안의 numpy 배열(SVM 계수, idf)을 읽기 전용 mmap으로 연다.
+# 같은 파일을 여는 프로세스(uvicorn 워커, 추론 프로세스 풀)끼리 페이지 캐시 한 벌을 공유한다.
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1") == "1"
+# auto: 버전 디렉터리에 scorer.npz가 있으면 경량 채점기, 없으면 sklearn / sklearn·compiled: 강제
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "auto")
 
-_vec = None
-_clf = None
+_WS = re.compile(r"\s\s+")
 
-def load_model():
-    global _vec, _clf
-    if _vec is None: _vec = joblib.load(VEC_PATH)
-    if _clf is None: _clf = joblib.load(CLF_PATH)
 
-def predict(text:str)->Tuple[str,float]:
-    load_model()
-    X = _vec.transform([text])
-    df = _clf.decision_function(X)
+class CompiledScorer:
+    """
+    train.py export_compiled()가 만든 아티팩트로 TfidfVectorizer(char_wb)+LinearSVC를 재현하는 NumPy 채점기.
+    sklearn을 import/unpickle하지 않고, 문장의 n-gram을 사전에서 찾아 가중치 행을 합산한다.
+    """
+
+    def __init__(self, d):
+        z = np.load(os.path.join(d, "scorer.npz"))
+        self.index = {t: i for i, t in enumerate(z["terms"].tolist())}
+        self.table = np.load(os.path.join(d, "scorer_table.npy"), mmap_mode="r" if MODEL_MMAP else None)
+        self.intercept = z["intercept"]
+        self.classes_ = z["classes"]
+        self.min_n, self.max_n = (int(x) for x in z["ngram_range"])
+        self.lowercase = bool(z["lowercase"])
+        self.sublinear_tf = bool(z["sublinear_tf"])
+
+    def _counts(self, text:str)->Dict[int,int]:
+        # sklearn의 _char_wb_ngrams와 동일한 규칙(단어 양끝 공백 패딩, 짧은 단어는 한 번만)
+        if self.lowercase:
+            text = text.lower()
+        index, counts = self.index, {}
+        for w in _WS.sub(" ", text).split():
+            w = " " + w + " "
+            w_len = len(w)
+            for n in range(self.min_n, self.max_n + 1):
+                offset = 0
+                while True:
+                    j = index.get(w[offset:offset + n])
+                    if j is not None:
+                        counts[j] = counts.get(j, 0) + 1
+                    if offset + n >= w_len:
+                        break
+                    offset += 1
+                if offset == 0:
+                    break
+        return counts
+
+    def decision_function(self, texts:List[str])->np.ndarray:
+        n_cls = self.table.shape[1] - 1
+        out = np.tile(self.intercept, (len(texts), 1))
+        for r, text in enumerate(texts):
+            counts = self._counts(text)
+            if not counts:
+                continue
+            idx = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.sublinear_tf:
+                tf = np.log(tf) + 1
+            rows = self.table[idx]
+            norm = np.sqrt(np.square(tf * rows[:, 0]).sum())
+            if norm > 0:
+                out[r] += tf @ rows[:, 1:] / norm
+        return out[:, 0] if n_cls == 1 else out
+
+
+class ModelBundle(NamedTuple):
+    version: str
+    vec: object
+    clf: object
+    scorer: Optional[CompiledScorer] = None
+    normalizer: Optional[int] = None  # 학습 때 쓴 정규화 버전(metrics.json의 normalizer)
+
+    @property
+    def classes(self):
+        return self.scorer.classes_ if self.scorer is not None else self.clf.classes_
+
+    def prepare(self, texts:List[str])->List[str]:
+        # 같은 정규화 버전으로 학습된 모델만 normalize_text를 거친다. 그 이전 모델(base 등)은
+        # 재학습 전까지 예전 서빙과 똑같이 원문을 넣어 예측이 바뀌지 않게 한다.
+        if self.normalizer != normalize.VERSION:
+            return texts
+        return [normalize.normalize_text(t) for t in texts]
+
+    def decision(self, texts:List[str])->np.ndarray:
+        if self.scorer is not None:
+            return self.scorer.decision_function(texts)
+        return self.clf.decision_function(self.vec.transform(texts))
+
+
+class Prediction(NamedTuple):
+    label: str
+    confidence: float
+    version: str
+
+
+# 현재 서비스 중인 번들. 교체는 참조 하나를 바꾸는 것이라 원자적이고,
+# 이미 옛 번들을 잡은 요청은 그 번들로 끝까지 처리된다(무중단 교체).
+_active: Optional[ModelBundle] = None
+_bundles: Dict[str, ModelBundle] = {}
+_lock = threading.Lock()
+
+
+def _load_bundle(version:str)->ModelBundle:
+    b = _bundles.get(version)
+    if b is not None:
+        return b
+    with _lock:
+        b = _bundles.get(version)
+        if b is None:
+            d = registry.version_dir(version)
+            normalizer = (registry.read_metrics(version) or {}).get("normalizer")
+            compiled = (d / "scorer.npz").exists() and (d / "scorer_table.npy").exists()
+            if MODEL_BACKEND == "compiled" or (MODEL_BACKEND == "auto" and compiled):
+                b = ModelBundle(version, None, None, CompiledScorer(d), normalizer)
+            else:
+                mode = "r" if MODEL_MMAP else None
+                b = ModelBundle(version,
+                                joblib.load(d / "tfidf.joblib", mmap_mode=mode),
+                                joblib.load(d / "svm.joblib", mmap_mode=mode),
+                                normalizer=normalizer)
+            _bundles[version] = b
+    return b
+
+def load_model()->ModelBundle:
+    global _active
+    if _active is None:
+        version = registry.read_active()
+        if version is None:
+            raise FileNotFoundError(f"no model found under {registry.MODEL_DIR}")
+        _active = _load_bundle(version)
+    return _active
+
+def active_version()->Optional[str]:
+    return _active.version if _active is not None else None
+
+def activate(version:str, persist:bool=True)->ModelBundle:
+    """
+    새 버전을 로드·워밍업한 뒤 활성 번들을 교체한다.
+    persist=True면 ACTIVE 파일도 갱신해서 다른 워커(파일 감시자)도 따라오게 한다.
+    """
+    global _active
+    if not registry.is_complete(version):
+        raise FileNotFoundError(f"model version not found: {version}")
+    b = _load_bundle(version)
+    b.decision(["warmup"])  # 첫 요청 지연 방지
+    prev = _active
+    _active = b
+    # 활성/직전 버전만 메모리에 유지(진행 중 요청은 자기 참조로 유지됨)
+    keep = {b.version} | ({prev.version} if prev is not None else set())
+    for v in list(_bundles):
+        if v not in keep:
+            _bundles.pop(v, None)
+    if persist:
+        registry.write_active(version)
+    return b
+
+def _decide(df:np.ndarray, classes)->List[Tuple[str,float]]:
+    # decision_function 결과(이진: 1차원, 다중: 2차원)를 (라벨, 신뢰도)로 변환
     if df.ndim == 1:
-        score = float(abs(df[0]))
-        conf = 1/(1+np.exp(-score/2))
-        label = _clf.classes_[1 if df[0]>0 else 0]
-        return label, float(conf)
-    i = int(df.argmax())
-    row = df[0]
-    ex = np.exp(row - row.max())
-    probs = ex/ex.sum()
-    return _clf.classes_[i], float(probs[i])
+        conf = 1/(1+np.exp(-np.abs(df)/2))
+        return [(classes[1 if d>0 else 0], float(c)) for d, c in zip(df, conf)]
+    idx = df.argmax(axis=1)
+    ex = np.exp(df - df.max(axis=1, keepdims=True))
+    probs = ex/ex.sum(axis=1, keepdims=True)
+    return [(classes[i], float(probs[r, i])) for r, i in enumerate(idx)]
+
+def predict_batch(texts:List[str], version:Optional[str]=None)->List[Prediction]:
+    """
+    여러 문장을 한 번의 transform/decision_function 호출로 분류(입력 순서 유지).
+    version을 주면 그 버전으로 채점(프로세스 풀 워커가 부모와 같은 버전을 쓰도록).
+    입력은 모델의 정규화 버전이 현재와 같을 때만 normalize_text를 거친다(ModelBundle.prepare).
+    """
+    if not texts:
+        return []
+    b = _load_bundle(version) if version else load_model()
+    return [Prediction(label, conf, b.version)
+            for label, conf in _decide(b.decision(b.prepare(texts)), b.classes)]
+
+def classify_cache_key(text:str, version:Optional[str]=None)->str:
+    """
+    classify 캐시 키. 번들이 실제로 채점하는 입력(prepare 결과)과 버전을 해시하므로
+    같은 키로 묶이는 문장은 새로 채점해도 같은 결과가 나온다.
+    """
+    b = _load_bundle(version) if version else load_model()
+    return classify_cache.key(b.prepare([text])[0], b.version)
+
+def predict(text:str)->Tuple[str,float]:
+    p = predict_batch([text])[0]
+    return p.label, p.confidence
 
 def label_to_department(label:str)->int:
     return DEPT_MAP.get(label, 4)
 
 def make_evidence(text:str,label:str):
     return evidence_keywords(text,label)
+
+async def watch_registry(interval:float):
+    """ACTIVE 파일 변경을 폴링해 다른 워커/배포 스크립트가 바꾼 버전으로 무중단 교체."""
+    last = registry.active_mtime()
+    while True:
+        await asyncio.sleep(interval)
+        mtime = registry.active_mtime()
+        if mtime == last:
+            continue
+        last = mtime
+        version = registry.read_active()
+        if version and version != active_version():
+            try:
+                # 로드/워밍업은 스레드에서 → 그동안 기존 버전으로 계속 서비스
+                await asyncio.to_thread(activate, version, False)
+                print("model hot-reloaded:", version)
+            except Exception as e:
+                print("model hot-reload failed:", e)
@@ -0,0 +1,50 @@
+import os, re
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+# 학습(ml/train.py)과 서빙(model 입력, 캐시 키, kNN)이 공유하는 텍스트 정규화.
+#  1) 한글/영문/숫자 외 문자 → 공백  2) 소문자  3) 불용어 토큰 제거  4) 연속 공백 하나로, 앞뒤 공백 제거
+# 규칙을 바꾸면 학습·서빙이 함께 바뀌므로 VERSION을 올리고 재학습할 것(metrics.json에 기록됨).
+VERSION = 1
+
+STOPWORDS_PATH = os.getenv("STOPWORDS_PATH",
+                           str(Path(__file__).resolve().parents[2] / "ml" / "stopwords_ko.txt"))
+
+_NON_WORD = re.compile(r"[^가-힣A-Za-z0-9\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def load_stopwords(path: str) -> FrozenSet[str]:
+    """한 줄에 하나, 빈 줄과 #주석은 무시. 파일이 없으면 불용어 없음."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return frozenset(w.strip().lower() for w in f if w.strip() and not w.lstrip().startswith("#"))
+    except FileNotFoundError:
+        return frozenset()
+
+
+def _compile_stopwords(words: FrozenSet[str]) -> Optional[re.Pattern]:
+    # 토큰 전체가 불용어일 때만 지움(앞뒤가 공백/문자열 경계). 긴 단어 우선으로 교대
+    if not words:
+        return None
+    alt = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+    return re.compile(rf"(?<!\S)(?:{alt})(?!\S)")
+
+
+STOPWORDS = load_stopwords(STOPWORDS_PATH)
+_STOP = _compile_stopwords(STOPWORDS)
+
+
+def normalize_text(s: str) -> str:
+    s = _NON_WORD.sub(" ", s).lower()
+    if _STOP is not None:
+        s = _STOP.sub(" ", s)
+    return _SPACES.sub(" ", s).strip()
+
+
+def normalize_series(col):
+    """pandas Series 전체를 벡터화된 .str 연산으로 정규화(normalize_text와 같은 결과)."""
+    s = col.astype(str).str.replace(_NON_WORD, " ", regex=True).str.lower()
+    if _STOP is not None:
+        s = s.str.replace(_STOP, " ", regex=True)
+    return s.str.replace(_SPACES, " ", regex=True).str.strip()
@@ -0,0 +1,103 @@
+
+import os, time, asyncio
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from ..db import PredictionLog
+from ..deps import engine
+from .metrics import stage_latency
+
+PREDLOG_ENABLED = os.getenv("PREDLOG_ENABLED", "1") == "1"
+PREDLOG_BUFFER = int(os.getenv("PREDLOG_BUFFER", "10000"))       # 링 버퍼 크기(넘치면 가장 오래된 항목부터 버림)
+PREDLOG_FLUSH_ROWS = int(os.getenv("PREDLOG_FLUSH_ROWS", "500"))  # 이만큼 쌓이면 즉시 flush
+PREDLOG_FLUSH_MS = float(os.getenv("PREDLOG_FLUSH_MS", "1000"))   # 아니면 이 주기로 flush
+
+
+class PredictionLogger:
+    """
+    예측 로그를 메모리 링 버퍼에 쌓고, 백그라운드 태스크가 N행/T ms마다 한 번의 bulk insert(executemany)로 저장.
+    요청 경로에서는 append만 하므로 DB 왕복이 응답 지연에 더해지지 않는다.
+    """
+
+    def __init__(self, maxlen: int = PREDLOG_BUFFER, flush_rows: int = PREDLOG_FLUSH_ROWS,
+                 flush_ms: float = PREDLOG_FLUSH_MS, enabled: bool = PREDLOG_ENABLED):
+        self.enabled = enabled
+        self._buf: deque = deque(maxlen=max(1, maxlen))
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = max(0.01, flush_ms / 1000)
+        self.dropped = 0   # 버퍼가 넘쳐 버려진 행
+        self.flushed = 0   # DB에 저장된 행
+        self.failed = 0    # insert 실패로 버려진 행
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def log(self, text: str, label: str, confidence: float, model_version: Optional[str]):
+        if not self.enabled:
+            return
+        if len(self._buf) == self._buf.maxlen:
+            self.dropped += 1
+        self._buf.append({"text": text, "predicted_label": label, "confidence": float(confidence),
+                          "model_version": model_version, "created_at": datetime.utcnow()})
+        if self._wake is not None and len(self._buf) >= self.flush_rows:
+            self._wake.set()
+
+    def _drain(self) -> List[dict]:
+        rows = []
+        while self._buf and len(rows) < self.flush_rows:
+            rows.append(self._buf.popleft())
+        return rows
+
+    @staticmethod
+    def _insert(rows: List[dict]):
+        with engine.begin() as conn:
+            conn.execute(insert(PredictionLog), rows)  # 리스트 파라미터 → executemany
+
+    async def flush(self):
+        while self._buf:
+            rows = self._drain()
+            t0 = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._insert, rows)
+                self.flushed += len(rows)
+                stage_latency.observe(time.perf_counter() - t0, "db_commit")
+            except Exception as e:
+                self.failed += len(rows)
+                print("prediction log flush failed:", e)
+                return
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def start(self):
+        if not self.enabled:
+            return
+        # 테이블이 없으면 생성(이 서비스는 마이그레이션 도구 없이 동작)
+        await asyncio.to_thread(PredictionLog.__table__.create, engine, checkfirst=True)
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()  # 종료 전 남은 로그 저장
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "buffered": len(self._buf), "capacity": self._buf.maxlen,
+                "flushed": self.flushed, "dropped": self.dropped, "failed": self.failed}
+
+
+prediction_logger = PredictionLogger()
@@ -0,0 +1,79 @@
+
+import os, json
+from pathlib import Path
+from typing import List, Optional
+
+# 모델 레지스트리 디렉터리 구조
+#   models/
+#     tfidf.joblib, svm.joblib, metrics.json   ← 레거시 단일 모델("base" 버전으로 취급)
+#     versions/<버전>/tfidf.joblib, svm.joblib, metrics.json
+#     ACTIVE                                   ← 현재 서비스 중인 버전 이름(한 줄)
+MODEL_DIR = Path(os.getenv("MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "models"))).resolve()
+VERSIONS_DIR = MODEL_DIR / "versions"
+ACTIVE_FILE = MODEL_DIR / "ACTIVE"
+BASE_VERSION = "base"
+MODEL_FILES = ("tfidf.joblib", "svm.joblib")
+
+
+def version_dir(version: str) -> Path:
+    if version == BASE_VERSION:
+        return MODEL_DIR
+    d = (VERSIONS_DIR / version).resolve()
+    if d.parent != VERSIONS_DIR.resolve():  # "../" 같은 경로 탈출 방지
+        raise ValueError(f"invalid model version: {version!r}")
+    return d
+
+
+def is_complete(version: str) -> bool:
+    try:
+        d = version_dir(version)
+    except ValueError:
+        return False
+    return all((d / f).exists() for f in MODEL_FILES)
+
+
+def list_versions() -> List[str]:
+    out = [BASE_VERSION] if is_complete(BASE_VERSION) else []
+    if VERSIONS_DIR.exists():
+        out += sorted(p.name for p in VERSIONS_DIR.iterdir() if p.is_dir() and is_complete(p.name))
+    return out
+
+
+def read_active() -> Optional[str]:
+    """ACTIVE 파일이 가리키는 버전. 없거나 불완전하면 base(있을 때)로 폴백."""
+    try:
+        v = ACTIVE_FILE.read_text(encoding="utf-8").strip()
+        if v and is_complete(v):
+            return v
+    except FileNotFoundError:
+        pass
+    return BASE_VERSION if is_complete(BASE_VERSION) else None
+
+
+def write_active(version: str):
+    # 임시 파일에 쓰고 rename → 다른 워커/감시자가 반쯤 쓴 내용을 읽지 않도록 원자적으로 교체
+    tmp = ACTIVE_FILE.with_suffix(".tmp")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, ACTIVE_FILE)
+
+
+def active_mtime() -> float:
+    try:
+        return ACTIVE_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+_metrics_cache: dict = {}
+
+def read_metrics(version: str) -> Optional[dict]:
+    # 버전 디렉터리는 만들어진 뒤 바뀌지 않으므로 한 번 읽은 결과를 재사용(mtime으로 재학습 덮어쓰기만 감지)
+    p = version_dir(version) / "metrics.json"
+    try:
+        mtime = p.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    hit = _metrics_cache.get(version)
+    if hit is None or hit[0] != mtime:
+        hit = _metrics_cache[version] = (mtime, json.loads(p.read_text(encoding="utf-8")))
+    return hit[1]
@@ -1,5 +1,6 @@
 
-from typing import Optional
+import os, json, time, threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 KEY_RULES = [
     ("시설", ["전등","형광등","엘리베이터","콘센트","누수","파손","수리","창문","문","냉난방기","에어컨"]),
@@ -12,18 +13,135 @@ DEPT_MAP = {"시설":1,"환경":2,"전산":3,"기타":4}
 #THRESHOLD = 0.50
 THRESHOLD = 0.99
 
+# 룰 사전 파일(JSON). {"라벨": ["키워드", ...], ...} 또는 [["라벨", [...]], ...]. 없으면 KEY_RULES 사용
+RULES_PATH = os.getenv("RULES_PATH", "")
+RULES_CHECK_SEC = float(os.getenv("RULES_CHECK_SEC", "5"))  # 파일 변경(mtime) 확인 주기(초)
+EVIDENCE_MAX = 5
+
+
+class RuleMatch(NamedTuple):
+    matches: List[Tuple[int, int, str]]  # (시작, 끝, 키워드) — 본문(소문자) 기준 위치, 겹침 포함
+    counts: Dict[str, int]               # 라벨별로 등장한 서로 다른 키워드 수
+    evidence: Dict[str, List[str]]       # 라벨별 등장 키워드(룰 사전 순서, 최대 EVIDENCE_MAX개)
+    best: Optional[str]                  # 키워드가 가장 많이 걸린 라벨(동률이면 사전 앞쪽)
+
+
+class KeywordAutomaton:
+    """
+    룰 사전을 Aho-Corasick 오토마톤으로 한 번 컴파일해 두고, 본문을 한 번만 훑어
+    모든 키워드 매칭(위치 포함)·라벨별 개수·근거 키워드를 구한다. 키워드 수와 무관하게 본문 길이에 비례.
+    기존 `kw in text` 규칙과 같은 결과(소문자 부분 문자열 일치)를 낸다.
+    """
+
+    def __init__(self, rules: List[Tuple[str, List[str]]]):
+        self.labels = [lab for lab, _ in rules]
+        self.size = sum(len(kws) for _, kws in rules)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, int]]] = [[]]  # 노드에서 끝나는 (라벨 번호, 키워드 순번)
+        self.keywords: List[List[str]] = []
+        for li, (_, kws) in enumerate(rules):
+            self.keywords.append(list(kws))
+            for ki, kw in enumerate(kws):
+                kw = kw.lower()
+                if not kw:
+                    continue
+                node = 0
+                for ch in kw:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    node = nxt
+                out[node].append((li, ki))
+        # 실패 링크(BFS, 루트 자식은 루트로). 출력은 실패 링크를 따라 합쳐 둔다 → 스캔 중 링크를 다시 따라갈 필요 없음
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, nxt in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                queue.append(nxt)
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def scan(self, text: str) -> RuleMatch:
+        goto, fail, out = self._goto, self._fail, self._out
+        keywords = self.keywords
+        matches: List[Tuple[int, int, str]] = []
+        seen = [set() for _ in self.labels]
+        node = 0
+        for i, ch in enumerate(text.lower()):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for li, ki in out[node]:
+                    kw = keywords[li][ki]
+                    matches.append((i + 1 - len(kw), i + 1, kw))
+                    seen[li].add(ki)
+        counts, evidence, best, hits = {}, {}, None, 0
+        for li, lab in enumerate(self.labels):
+            if not seen[li]:
+                continue
+            c = len(seen[li])
+            counts[lab] = counts.get(lab, 0) + c
+            evidence[lab] = [keywords[li][ki] for ki in sorted(seen[li])][:EVIDENCE_MAX]
+            if c > hits:
+                best, hits = lab, c
+        return RuleMatch(matches, counts, evidence, best)
+
+
+def _load_rules(path: str) -> List[Tuple[str, List[str]]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    items = data.items() if isinstance(data, dict) else data
+    rules = [(str(lab), [str(kw) for kw in kws]) for lab, kws in items]
+    if not rules:
+        raise ValueError(f"empty rule set: {path}")
+    return rules
+
+
+_automaton: Optional[KeywordAutomaton] = None
+_rules_mtime: Optional[float] = None
+_next_check = 0.0
+_lock = threading.Lock()
+
+
+def get_automaton() -> KeywordAutomaton:
+    """컴파일된 오토마톤. RULES_PATH 파일이 바뀌면(mtime) 다시 컴파일해 참조만 교체한다."""
+    global _automaton, _rules_mtime, _next_check
+    a = _automaton
+    if a is not None and (not RULES_PATH or time.monotonic() < _next_check):
+        return a
+    with _lock:
+        _next_check = time.monotonic() + RULES_CHECK_SEC
+        if not RULES_PATH:
+            if _automaton is None:
+                _automaton = KeywordAutomaton(KEY_RULES)
+            return _automaton
+        try:
+            mtime = os.stat(RULES_PATH).st_mtime
+            if _automaton is None or mtime != _rules_mtime:
+                _automaton = KeywordAutomaton(_load_rules(RULES_PATH))
+                _rules_mtime = mtime
+                print(f"keyword rules compiled: {RULES_PATH} ({_automaton.size} keywords)")
+        except Exception as e:
+            # 파일이 깨졌으면 기존 룰 유지(처음이면 내장 룰)
+            print("keyword rules load failed:", e)
+            if _automaton is None:
+                _automaton = KeywordAutomaton(KEY_RULES)
+        return _automaton
+
+
+def match_rules(text:str)->RuleMatch:
+    return get_automaton().scan(text)
+
 def apply_keyword_rules(text:str)->Optional[str]:
-    t = text.lower()
-    best, hits = None, 0
-    for lab, kws in KEY_RULES:
-        c = sum(1 for kw in kws if kw.lower() in t)
-        if c > hits:
-            best, hits = lab, c
-    return best if hits>0 else None
+    return match_rules(text).best
 
 def evidence_keywords(text:str, label:str)->list[str]:
-    t = text.lower()
-    for lab, kws in KEY_RULES:
-        if lab == label:
-            return [kw for kw in kws if kw.lower() in t][:5]
-    return []
+    return match_rules(text).evidence.get(label, [])
@@ -0,0 +1,184 @@
+"""
+분류 핫패스 마이크로 벤치마크.
+
+  cd Classifier/backend
+  python -m bench.run --out bench/results.json                     # 측정 → JSON 저장
+  python -m bench.run --baseline bench/baseline.json --tolerance 0.15   # 기준 대비 회귀면 exit 1
+
+항목별로 ops/sec, 호출당 p50/p99(us), 호출당 메모리 할당 피크(tracemalloc, bytes)를 기록한다.
+지연은 tracemalloc 없이 따로 재고(추적 오버헤드 제외), 할당은 별도 패스에서 잰다.
+--repeat번 반복한 값의 중앙값을 쓰고, 같은 --seed면 입력 코퍼스가 같다.
+"""
+import os, sys, json, time, asyncio, argparse, platform, subprocess, tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from bench.corpus import generate
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "loadtest"))
+from fakes import FakeRedis  # noqa: E402  (부하 테스트와 같은 메모리 Redis)
+from app.schemas import ClassifyOut, Evidence
+from app.services import model
+from app.services.cache import TTLCache, TwoTierCache
+from app.services.rules import apply_keyword_rules, evidence_keywords
+
+
+def _measure(fn: Callable[[int], None], n: int, warmup: int) -> Dict[str, float]:
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(n, dtype=np.int64)
+    pc = time.perf_counter_ns
+    t_start = pc()
+    for i in range(n):
+        t0 = pc()
+        fn(i)
+        samples[i] = pc() - t0
+    total = (pc() - t_start) / 1e9
+    # 할당: 별도 패스(추적 중에는 지연이 왜곡되므로)
+    peaks = []
+    tracemalloc.start()
+    for i in range(min(n, 200)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(i)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    us = samples / 1000
+    return {
+        "n": n,
+        "ops_per_sec": n / total if total > 0 else 0.0,
+        "mean_us": float(us.mean()),
+        "p50_us": float(np.percentile(us, 50)),
+        "p99_us": float(np.percentile(us, 99)),
+        "alloc_peak_bytes": int(np.median(peaks)) if peaks else 0,
+    }
+
+
+def build_cases(texts: List[str], labels: List[str], batch: int, redis) -> Dict[str, Callable[[int], None]]:
+    m = len(texts)
+    loop = asyncio.new_event_loop()
+    cache = TwoTierCache("bench", TTLCache(10000, 60), 60)
+    payloads = [ClassifyOut(type=l, department_id=model.label_to_department(l), confidence=0.5,
+                            evidence=Evidence(keywords=[])).model_dump_json().encode("utf-8") for l in labels]
+    version = model.active_version()
+    ring = texts + texts[:batch]  # 끝에서 잘리지 않게 앞부분을 이어 붙임
+
+    def predict(i):
+        model.predict(texts[i % m])
+
+    def predict_batch(i):
+        s = (i * batch) % m
+        model.predict_batch(ring[s:s + batch], version)
+
+    def rules(i):
+        apply_keyword_rules(texts[i % m])
+
+    def evidence(i):
+        evidence_keywords(texts[i % m], labels[i % m])
+
+    def classify_out(i):
+        l = labels[i % m]
+        ClassifyOut(type=l, department_id=model.label_to_department(l), confidence=0.87,
+                    evidence=Evidence(keywords=["엘리베이터", "고장"]), model_version=version).model_dump_json()
+
+    async def _round_trip(i):
+        key = model.classify_cache_key(texts[i % m], version)
+        if await cache.get(redis, key) is None:
+            await cache.set(redis, key, payloads[i % m])
+
+    def cache_round_trip(i):
+        loop.run_until_complete(_round_trip(i))
+
+    return {"predict": predict, f"predict_batch{batch}": predict_batch, "apply_keyword_rules": rules,
+            "evidence_keywords": evidence, "classify_out": classify_out, "cache_round_trip": cache_round_trip}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """ops/sec가 (1-tolerance)배 미만으로 떨어지거나 p99가 (1+tolerance)배를 넘으면 회귀."""
+    failures = []
+    for name, cur in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if cur["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            failures.append(f"{name}: ops/sec {cur['ops_per_sec']:.0f} < baseline {base['ops_per_sec']:.0f}")
+        if cur["p99_us"] > base["p99_us"] * (1 + tolerance):
+            failures.append(f"{name}: p99 {cur['p99_us']:.1f}us > baseline {base['p99_us']:.1f}us")
+    return failures
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="classification hot-path micro benchmarks")
+    ap.add_argument("-n", type=int, default=2000, help="항목별 측정 호출 수")
+    ap.add_argument("--warmup", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=3, help="반복 측정 후 항목별 중앙값(잡음 완화)")
+    ap.add_argument("--corpus", type=int, default=5000, help="합성 코퍼스 크기")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--batch", type=int, default=64)
+    ap.add_argument("--only", nargs="*", help="이 항목만 실행")
+    ap.add_argument("--redis", help="캐시 왕복에 실제 Redis 사용(예: redis://localhost:6379/15)")
+    ap.add_argument("--out", help="결과 JSON 경로(없으면 stdout)")
+    ap.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="허용 회귀 비율")
+    args = ap.parse_args(argv)
+
+    model.load_model()
+    corpus = generate(args.corpus, args.seed)
+    texts, labels = [t for t, _ in corpus], [l for _, l in corpus]
+    if args.redis:
+        import redis.asyncio as aioredis
+        redis = aioredis.from_url(args.redis)
+    else:
+        redis = FakeRedis()  # 네트워크를 빼고 캐시 코드(정규화·해시·L1) 비용만 잼
+
+    results = {}
+    for name, fn in build_cases(texts, labels, args.batch, redis).items():
+        if args.only and name not in args.only:
+            continue
+        runs = [_measure(fn, args.n, args.warmup) for _ in range(max(1, args.repeat))]
+        r = results[name] = {k: type(runs[0][k])(np.median([x[k] for x in runs])) for k in runs[0]}
+        print(f"{name:22s} {r['ops_per_sec']:>12.0f} ops/s  p50 {r['p50_us']:>9.1f}us  "
+              f"p99 {r['p99_us']:>9.1f}us  alloc {r['alloc_peak_bytes']:>8d}B", file=sys.stderr)
+
+    lengths = np.array([len(t) for t in texts])
+    out = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "model_version": model.active_version(),
+            "model_backend": model.MODEL_BACKEND,
+            "corpus": {"size": len(texts), "seed": args.seed, "len_p50": float(np.percentile(lengths, 50)),
+                       "len_p99": float(np.percentile(lengths, 99))},
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    text = json.dumps(out, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        failures = compare(out, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for f in failures:
+            print("REGRESSION", f, file=sys.stderr)
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,74 +1,334 @@
-import os, re, json, math
+import os, sys, json, math, time, pickle, argparse
 import pandas as pd
+from datetime import datetime
 from pathlib import Path
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split, ParameterGrid, StratifiedKFold, cross_validate
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.pipeline import make_pipeline
 from sklearn.svm import LinearSVC
+from sklearn.linear_model import SGDClassifier, LogisticRegression
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 import joblib
+from joblib import Parallel, delayed
+import numpy as np
 
 ROOT = Path(__file__).resolve().parent
 DATA = ROOT / "dataset.csv"
-MODEL_DIR = ROOT.parent / "models"
+# 서빙과 같은 정규화 모듈을 쓴다(Classifier/backend를 경로에 추가)
+sys.path.insert(0, str(ROOT.parent))
+from app.services import normalize  # noqa: E402
+MODEL_DIR = Path(os.getenv("MODEL_DIR", ROOT.parent / "models")).resolve()  # 서버(services/registry.py)와 같은 환경 변수
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
-def clean(s:str)->str:
-    s = re.sub(r"[^가-힣A-Za-z0-9\\s]", " ", s)
-    s = re.sub(r"\\s+", " ", s)
-    return s.strip()
-
-df = pd.read_csv(DATA).dropna(subset=["text","label"])
-df["text"] = df["text"].map(clean)
-df = df[df["text"].str.len() > 0].reset_index(drop=True)
-
-# --- 안전장치: 클래스별 최소 샘플 확보(≥2) ---
-counts = df["label"].value_counts()
-if (counts < 2).any():
-    parts = []
-    for lab, grp in df.groupby("label"):
-        if len(grp) >= 2:
-            parts.append(grp)
-        else:
-            # 1개밖에 없으면 동일 샘플 복제해서 최소 2개 맞춤
-            parts.append(pd.concat([grp, grp], ignore_index=True))
-    df = pd.concat(parts, ignore_index=True)
+CLASSES = ["기타", "시설", "전산", "환경"]  # 스트리밍 학습은 첫 partial_fit부터 전체 클래스를 알아야 함
+
+def export_compiled(vec: TfidfVectorizer, clf: LinearSVC, out_dir: Path):
+    """
+    서빙용 경량 아티팩트: sklearn 없이 n-gram 조회+합산만으로 채점(services/model.py CompiledScorer).
+      scorer.npz        : terms(어휘 순서), intercept, classes, 벡터라이저 설정
+      scorer_table.npy  : [n_terms, 1+C] = (idf, idf*클래스별 가중치) — mmap으로 열 수 있는 평면 배열
+    """
+    if vec.analyzer != "char_wb" or vec.norm != "l2" or not vec.use_idf:
+        raise ValueError("export_compiled: char_wb + l2 + idf 구성만 지원")
+    terms = np.empty(len(vec.vocabulary_), dtype=object)
+    for t, i in vec.vocabulary_.items():
+        terms[i] = t
+    idf = vec.idf_.astype(np.float64)
+    coef = np.asarray(clf.coef_, dtype=np.float64)          # [C, n] (이진이면 [1, n])
+    table = np.hstack([idf[:, None], idf[:, None] * coef.T])
+    np.save(out_dir / "scorer_table.npy", table)
+    np.savez(out_dir / "scorer.npz",
+             terms=terms.astype(str),
+             intercept=np.asarray(clf.intercept_, dtype=np.float64),
+             classes=np.asarray(clf.classes_).astype(str),
+             ngram_range=np.asarray(vec.ngram_range),
+             lowercase=vec.lowercase, sublinear_tf=vec.sublinear_tf)
+
+def save_version(vec, clf, metrics: dict, extra_files: dict | None = None, compiled: bool = True) -> Path:
+    # --- 버전 디렉터리에 저장 후 ACTIVE 포인터 교체 → 서비스가 재시작 없이 새 모델로 핫 리로드 ---
+    # MODEL_VERSION 미지정 시 타임스탬프, MODEL_ACTIVATE=0이면 저장만 하고 활성화는 하지 않음
+    version = os.getenv("MODEL_VERSION") or datetime.now().strftime("%Y%m%d-%H%M%S")
+    out_dir = MODEL_DIR / "versions" / version
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # 압축 없이 저장해야 서비스에서 mmap_mode로 열 수 있음
+    joblib.dump(vec, out_dir / "tfidf.joblib")
+    joblib.dump(clf, out_dir / "svm.joblib")
+    if compiled:
+        export_compiled(vec, clf, out_dir)
+    for name, data in (extra_files or {}).items():
+        with (out_dir / name).open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    with (out_dir / "metrics.json").open("w", encoding="utf-8") as f:
+        json.dump({**metrics, "version": version, "normalizer": normalize.VERSION,
+                   "trained_at": datetime.now().isoformat(timespec="seconds")},
+                  f, ensure_ascii=False, indent=2)
+
+    if os.getenv("MODEL_ACTIVATE", "1") == "1":
+        tmp = MODEL_DIR / "ACTIVE.tmp"
+        tmp.write_text(version + "\n", encoding="utf-8")
+        os.replace(tmp, MODEL_DIR / "ACTIVE")
+
+    print("saved ->", out_dir)
+    return out_dir
+
+def load_dataset() -> pd.DataFrame:
+    df = pd.read_csv(DATA).dropna(subset=["text","label"])
+    df["text"] = normalize.normalize_series(df["text"])
+    df = df[df["text"].str.len() > 0].reset_index(drop=True)
+
+    # --- 안전장치: 클래스별 최소 샘플 확보(≥2) ---
     counts = df["label"].value_counts()
+    if (counts < 2).any():
+        parts = []
+        for lab, grp in df.groupby("label"):
+            if len(grp) >= 2:
+                parts.append(grp)
+            else:
+                # 1개밖에 없으면 동일 샘플 복제해서 최소 2개 맞춤
+                parts.append(pd.concat([grp, grp], ignore_index=True))
+        df = pd.concat(parts, ignore_index=True)
+    return df
 
-# --- 동적 test_size: 테스트 샘플 수 ≥ 클래스 수 ---
-n = len(df)
-k = df["label"].nunique()
-# 기본 0.2, 하지만 n*test_size >= k 가 되도록 상향
-ts = max(0.2, (k + 0.5) / n)  # +0.5 여유
-ts = min(ts, 0.5)             # 너무 커지지 않도록 상한
+def train_full(args):
+    df = load_dataset()
 
-try:
-    X_train, X_test, y_train, y_test = train_test_split(
-        df["text"], df["label"], test_size=ts, random_state=42, stratify=df["label"]
-    )
-except ValueError:
-    # 여전히 불가능하면 stratify 없이 분할(소형 데이터 대응)
-    X_train, X_test, y_train, y_test = train_test_split(
-        df["text"], df["label"], test_size=ts, random_state=42, stratify=None
-    )
+    # --- 동적 test_size: 테스트 샘플 수 ≥ 클래스 수 ---
+    n = len(df)
+    k = df["label"].nunique()
+    # 기본 0.2, 하지만 n*test_size >= k 가 되도록 상향
+    ts = max(0.2, (k + 0.5) / n)  # +0.5 여유
+    ts = min(ts, 0.5)             # 너무 커지지 않도록 상한
+
+    try:
+        X_train, X_test, y_train, y_test = train_test_split(
+            df["text"], df["label"], test_size=ts, random_state=42, stratify=df["label"]
+        )
+    except ValueError:
+        # 여전히 불가능하면 stratify 없이 분할(소형 데이터 대응)
+        X_train, X_test, y_train, y_test = train_test_split(
+            df["text"], df["label"], test_size=ts, random_state=42, stratify=None
+        )
+
+    vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(2,5), min_df=1, sublinear_tf=True)
+    Xtr = vec.fit_transform(X_train)
+    clf = LinearSVC()
+    clf.fit(Xtr, y_train)
+
+    Xt = vec.transform(X_test)
+    pred = clf.predict(Xt)
+    acc = accuracy_score(y_test, pred)
+    f1m = f1_score(y_test, pred, average="macro")
+
+    print("Samples:", n, "Classes:", k, f"test_size={ts:.2f}")
+    print("ACC:", acc)
+    print("F1(macro):", f1m)
+    print(classification_report(y_test, pred))
 
-vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(2,5), min_df=1, sublinear_tf=True)
-Xtr = vec.fit_transform(X_train)
-clf = LinearSVC()
-clf.fit(Xtr, y_train)
+    save_version(vec, clf, {"accuracy": float(acc), "f1_macro": float(f1m), "samples": int(n), "mode": "full"})
+
+def _resume_dir(version: str | None) -> Path | None:
+    # --resume: 지정 버전(없으면 ACTIVE)이 스트리밍 모델이면 거기서 이어서 학습
+    if version is None:
+        try:
+            version = (MODEL_DIR / "ACTIVE").read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+    d = MODEL_DIR / "versions" / version
+    return d if (d / "stream_state.json").exists() else None
+
+def train_stream(args):
+    """
+    아웃오브코어 증분 학습: CSV를 chunk 단위로 읽어 HashingVectorizer(무상태) → SGDClassifier.partial_fit.
+    메모리는 chunk 크기에만 비례한다. --resume이면 이전 스트리밍 모델을 불러와 이미 학습한 행 이후만 학습.
+    평가는 progressive validation(각 chunk를 학습 전에 먼저 예측)으로 별도 홀드아웃 없이 계산.
+    """
+    clf, rows_seen, hash_bits = None, 0, args.hash_bits
+    if args.resume:
+        d = _resume_dir(args.resume_from)
+        if d is None:
+            raise SystemExit("resume: 이어서 학습할 스트리밍 모델이 없습니다(먼저 --resume 없이 실행)")
+        clf = joblib.load(d / "svm.joblib")
+        state = json.loads((d / "stream_state.json").read_text(encoding="utf-8"))
+        rows_seen, hash_bits = state["rows_seen"], state["hash_bits"]  # 특징 공간은 이전 모델과 같아야 함
+        print("resume from", d.name, "rows_seen =", rows_seen)
+    if clf is None:
+        clf = SGDClassifier(loss="hinge", alpha=args.alpha, random_state=42)
+    vec = HashingVectorizer(analyzer="char_wb", ngram_range=(2,5), n_features=2**hash_bits,
+                            alternate_sign=False, norm="l2")
+
+    # 이미 학습한 데이터 행은 건너뜀 → 새로 추가된 라벨 데이터만 벡터화/학습
+    # (skiprows는 빈 줄·여러 줄 셀 때문에 물리 줄 번호와 어긋날 수 있어 파싱된 행 기준으로 자름)
+    reader = pd.read_csv(args.data, chunksize=args.chunk_size)
+    pos = new_rows = trained = correct = 0
+    conf = np.zeros((len(CLASSES), len(CLASSES)), dtype=np.int64)  # progressive validation 혼동행렬
+    lab_idx = {c: i for i, c in enumerate(CLASSES)}
+    for chunk in reader:
+        start, pos = pos, pos + len(chunk)
+        if pos <= rows_seen:
+            continue
+        chunk = chunk.iloc[max(0, rows_seen - start):]
+        new_rows += len(chunk)
+        chunk = chunk.dropna(subset=["text","label"])
+        chunk = chunk[chunk["label"].isin(CLASSES)]
+        texts = normalize.normalize_series(chunk["text"])
+        mask = texts.str.len() > 0
+        texts, labels = texts[mask], chunk["label"][mask]
+        if texts.empty:
+            continue
+        X = vec.transform(texts)
+        if hasattr(clf, "coef_"):
+            pred = clf.predict(X)
+            correct += int((pred == labels.values).sum())
+            for y, p in zip(labels.values, pred):
+                conf[lab_idx[y], lab_idx[p]] += 1
+        clf.partial_fit(X, labels.values, classes=CLASSES)
+        trained += len(texts)
+        print(f"chunk: +{len(texts)} rows (total new {trained})")
+
+    if trained == 0 and not args.resume:
+        raise SystemExit("stream: 학습할 데이터가 없습니다")
+    if trained == 0:
+        print("새로 추가된 행이 없습니다. 저장하지 않습니다.")
+        return
+
+    evaluated = int(conf.sum())
+    tp = np.diag(conf).astype(float)
+    denom = conf.sum(axis=0) + conf.sum(axis=1)
+    f1m = float(np.mean(2 * tp[denom > 0] / denom[denom > 0])) if evaluated else None  # 등장한 클래스 기준
+    acc = (correct / evaluated) if evaluated else None
+    print("progressive ACC:", acc, "F1(macro):", f1m, "evaluated:", evaluated)
+
+    # 서빙 코드가 tfidf.joblib/svm.joblib의 transform/decision_function만 쓰므로 같은 파일명으로 저장.
+    # 해싱 벡터라이저에는 어휘가 없어 경량 채점기(export_compiled)는 만들지 않는다.
+    save_version(vec, clf,
+                 {"accuracy": acc, "f1_macro": f1m, "samples": trained, "mode": "stream",
+                  "eval": "progressive"},
+                 extra_files={"stream_state.json": {"rows_seen": rows_seen + new_rows,
+                                                    "hash_bits": hash_bits}},
+                 compiled=False)
+
+# --- 하이퍼파라미터 탐색: 후보마다 정확도/macro-F1/학습시간/추론지연/모델크기를 기록 ---
+SEARCH_GRID = {
+    "analyzer": ["char_wb", "char"],
+    "ngram_range": [(1,3), (2,4), (2,5)],
+    "min_df": [1, 2],
+    "sublinear_tf": [True, False],
+    "C": [0.5, 1.0, 2.0],
+    "clf": ["linearsvc", "logreg", "sgd"],
+}
+
+def _build(params: dict):
+    vec = TfidfVectorizer(analyzer=params["analyzer"], ngram_range=tuple(params["ngram_range"]),
+                          min_df=params["min_df"], sublinear_tf=params["sublinear_tf"])
+    C = params["C"]
+    if params["clf"] == "logreg":
+        clf = LogisticRegression(C=C, max_iter=1000)
+    elif params["clf"] == "sgd":
+        clf = SGDClassifier(loss="hinge", alpha=1e-4 / C, random_state=42)
+    else:
+        clf = LinearSVC(C=C, dual="auto")
+    return vec, clf
+
+def _eval_candidate(params: dict, X: list, y: list, folds: int, probe: list) -> dict:
+    # 개별 후보는 단일 코어에서 순차 실행, 후보들끼리 병렬(Parallel)로 전 코어 사용
+    out = {"params": {**params, "ngram_range": list(params["ngram_range"])}}
+    try:
+        vec, clf = _build(params)
+        cv = cross_validate(make_pipeline(vec, clf), X, y, error_score="raise",
+                            cv=StratifiedKFold(folds, shuffle=True, random_state=42),
+                            scoring=("accuracy", "f1_macro"))
+        vec, clf = _build(params)
+        t0 = time.perf_counter()
+        clf.fit(vec.fit_transform(X), y)
+        fit_s = time.perf_counter() - t0
+        # 서빙과 같은 단건 호출(transform+decision_function) 지연
+        t0 = time.perf_counter()
+        for t in probe:
+            clf.decision_function(vec.transform([t]))
+        single_us = (time.perf_counter() - t0) / len(probe) * 1e6
+        t0 = time.perf_counter()
+        clf.decision_function(vec.transform(probe))
+        batch_us = (time.perf_counter() - t0) / len(probe) * 1e6
+        out.update({
+            "accuracy": float(np.mean(cv["test_accuracy"])),
+            "f1_macro": float(np.mean(cv["test_f1_macro"])),
+            "fit_time_s": float(fit_s),
+            "latency_us": float(single_us),
+            "latency_us_batched": float(batch_us),
+            "model_bytes": len(pickle.dumps(vec)) + len(pickle.dumps(clf)),
+            "n_features": len(vec.vocabulary_),
+        })
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+def train_search(args):
+    """
+    SEARCH_GRID(또는 --grid JSON)의 모든 조합을 교차검증. 후보들은 joblib으로 병렬 평가.
+    --max-latency-us 이내 후보 중 macro-F1 최고(동률이면 더 빠른 것)를 전체 데이터로 재학습해 새 버전으로 저장하고,
+    전 후보의 결과를 metrics.json의 "search"에 함께 기록한다.
+    """
+    df = load_dataset()
+    X, y = df["text"].tolist(), df["label"].tolist()
+    folds = int(min(args.cv, df["label"].value_counts().min()))
+    if folds < 2:
+        raise SystemExit("search: 클래스별 샘플이 2개 이상 있어야 교차검증 가능")
+    grid = json.loads(Path(args.grid).read_text(encoding="utf-8")) if args.grid else SEARCH_GRID
+    candidates = list(ParameterGrid(grid))
+    probe = (X * (args.probe // max(len(X), 1) + 1))[:args.probe]
+    print(f"search: {len(candidates)} candidates x {folds}-fold, n_jobs={args.jobs}")
+
+    results = Parallel(n_jobs=args.jobs, verbose=5)(
+        delayed(_eval_candidate)(p, X, y, folds, probe) for p in candidates
+    )
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        raise SystemExit("search: 모든 후보가 실패했습니다")
+    eligible = [r for r in ok if args.max_latency_us is None or r["latency_us"] <= args.max_latency_us]
+    if not eligible:
+        fastest = min(ok, key=lambda r: r["latency_us"])
+        raise SystemExit(f"search: --max-latency-us {args.max_latency_us:g}us 이내 후보가 없습니다"
+                         f"(가장 빠른 후보 {fastest['latency_us']:.0f}us {fastest['params']})")
+    best = max(eligible, key=lambda r: (r["f1_macro"], -r["latency_us"]))
+    for r in sorted(ok, key=lambda r: -r["f1_macro"])[:10]:
+        print(f"F1={r['f1_macro']:.3f} ACC={r['accuracy']:.3f} {r['latency_us']:.0f}us "
+              f"{r['model_bytes']/1024:.0f}KB {r['params']}")
+    print("selected:", best["params"])
 
-Xt = vec.transform(X_test)
-pred = clf.predict(Xt)
-acc = accuracy_score(y_test, pred)
-f1m = f1_score(y_test, pred, average="macro")
+    params = {**best["params"], "ngram_range": tuple(best["params"]["ngram_range"])}
+    vec, clf = _build(params)
+    clf.fit(vec.fit_transform(X), y)
+    save_version(vec, clf,
+                 {"accuracy": best["accuracy"], "f1_macro": best["f1_macro"], "samples": len(X),
+                  "mode": "search", "cv_folds": folds, "selected": best, "search": results},
+                 compiled=params["analyzer"] == "char_wb")  # 경량 채점기는 char_wb만 재현
 
-print("Samples:", n, "Classes:", k, f"test_size={ts:.2f}")
-print("ACC:", acc)
-print("F1(macro):", f1m)
-print(classification_report(y_test, pred))
+def main():
+    ap = argparse.ArgumentParser(description="민원 분류 모델 학습")
+    sub = ap.add_subparsers(dest="cmd")
+    sub.add_parser("full", help="전체 데이터로 TF-IDF + LinearSVC 재학습(기본)")
+    st = sub.add_parser("stream", help="CSV를 chunk로 읽는 증분(out-of-core) 학습")
+    st.add_argument("--data", type=Path, default=DATA)
+    st.add_argument("--chunk-size", type=int, default=50_000)
+    st.add_argument("--hash-bits", type=int, default=20)
+    st.add_argument("--alpha", type=float, default=1e-5)
+    st.add_argument("--resume", action="store_true", help="이전 스트리밍 모델에서 이어서, 새 행만 학습")
+    st.add_argument("--resume-from", default=None, help="이어서 학습할 버전(기본: ACTIVE)")
+    se = sub.add_parser("search", help="하이퍼파라미터 교차검증 탐색(전 코어 병렬) 후 최적 후보 저장")
+    se.add_argument("--cv", type=int, default=5)
+    se.add_argument("--jobs", type=int, default=-1, help="병렬 작업 수(-1: 전 코어)")
+    se.add_argument("--grid", default=None, help="탐색 그리드 JSON 파일(기본: SEARCH_GRID)")
+    se.add_argument("--probe", type=int, default=200, help="지연 측정에 쓸 문장 수")
+    se.add_argument("--max-latency-us", type=float, default=None, help="단건 추론 지연 상한(μs)")
+    args = ap.parse_args()
 
-joblib.dump(vec, MODEL_DIR / "tfidf.joblib")
-joblib.dump(clf, MODEL_DIR / "svm.joblib")
-with (MODEL_DIR / "metrics.json").open("w", encoding="utf-8") as f:
-    json.dump({"accuracy": float(acc), "f1_macro": float(f1m)}, f, ensure_ascii=False, indent=2)
+    if args.cmd == "stream":
+        train_stream(args)
+    elif args.cmd == "search":
+        train_search(args)
+    else:
+        train_full(args)
 
-print("saved ->", MODEL_DIR)
+if __name__ == "__main__":
+    main()
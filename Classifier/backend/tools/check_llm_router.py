@@ -0,0 +1,142 @@
+"""
+LLM 라우터 자동 점검: fake_gemini 서버를 임시 포트로 띄우고 지연·오류를 바꿔 가며
+서킷 브레이커(open → half_open probe 1건 → closed/open), 요청별 데드라인 예산, 헤징을 확인한다.
+하나라도 어긋나면 exit 1.
+
+  cd Classifier/backend
+  python tools/check_llm_router.py
+"""
+import os, sys, time, asyncio, threading
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "loadtest"))
+from tools.fake_gemini import Handler, Server  # noqa: E402
+from fakes import FakeRedis  # noqa: E402  (Redis 없이 돌도록 2차 캐시를 메모리로)
+
+FAILURES = 3
+RESET_SEC = 0.3
+HEDGE_MS = 100
+
+
+def _serve() -> Server:
+    srv = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def _fake(latency_ms: float = 0, error_rate: float = 0, malformed_rate: float = 0):
+    Handler.latency, Handler.error_rate, Handler.malformed_rate = latency_ms / 1000, error_rate, malformed_rate
+
+
+async def _checks(r, failed: List[str]):
+    n = 0
+
+    async def route(timeout=None):
+        nonlocal n
+        n += 1  # 매번 다른 문장 → 결과 캐시·single-flight에 걸리지 않음
+        try:
+            return await r.llm_route(f"엘리베이터 고장 {n}번", timeout)
+        except Exception as e:  # 라우터는 예외 대신 사유를 돌려줘야 함
+            return {"label": None, "reason": f"raised:{type(e).__name__}"}
+
+    def check(name: str, ok: bool, detail=""):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}" + (f"  ({detail})" if detail and not ok else ""))
+        if not ok:
+            failed.append(name)
+
+    b = r._breaker
+
+    _fake()
+    res = await route()
+    check("정상 응답", res.get("reason") == "gemini_ok" and res.get("label") == "시설", res)
+    check("초기 상태 closed", b.state == b.CLOSED, b.stats())
+
+    # 1) 연속 실패 → open, open 동안은 upstream을 부르지 않음
+    _fake(error_rate=1)
+    reasons = [(await route())["reason"] for _ in range(FAILURES)]
+    check("503은 upstream 실패", reasons == ["gemini_http_503"] * FAILURES, reasons)
+    check(f"연속 {FAILURES}회 실패 후 open", b.state == b.OPEN, b.stats())
+    calls = Handler.calls["generate"]
+    res = await route()
+    check("open이면 llm_circuit_open", res["reason"] == "llm_circuit_open", res)
+    check("open이면 upstream 호출 없음", Handler.calls["generate"] == calls, Handler.calls)
+
+    # 2) reset 후 half_open: probe 한 건만 통과, 성공하면 closed
+    _fake(latency_ms=200)
+    await asyncio.sleep(RESET_SEC)
+    a, c = await asyncio.gather(route(), route())
+    check("half_open probe는 한 건만", (a["reason"], c["reason"]) == ("gemini_ok", "llm_circuit_open"), (a, c))
+    check("probe 성공 → closed", b.state == b.CLOSED, b.stats())
+
+    # 3) probe 실패 → 다시 open
+    _fake(error_rate=1)
+    for _ in range(FAILURES):
+        await route()
+    await asyncio.sleep(RESET_SEC)
+    res = await route()
+    check("probe 실패 → 다시 open", res["reason"] == "gemini_http_503" and b.state == b.OPEN, (res, b.stats()))
+    res = await route()
+    check("재open 직후 short-circuit", res["reason"] == "llm_circuit_open", res)
+
+    # 4) probe 중 응답 처리 예외(문자열이 아닌 text)도 실패로 기록 → half_open에 묶이지 않음
+    _fake(malformed_rate=1)
+    await asyncio.sleep(RESET_SEC)
+    res = await route()
+    check("잘못된 응답은 gemini_error", res["reason"].startswith("gemini_error:"), res)
+    check("잘못된 응답 probe → open", b.state == b.OPEN and not b._probe_inflight, b.stats())
+    _fake()
+    await asyncio.sleep(RESET_SEC)
+    res = await route()
+    check("다음 probe 통과 → closed", res["reason"] == "gemini_ok" and b.state == b.CLOSED, (res, b.stats()))
+
+    # 5) 데드라인 예산: 남은 예산을 넘기지 않고, 예산이 없으면 upstream을 부르지 않음
+    _fake(latency_ms=500)
+    t0 = time.perf_counter()
+    res = await route(timeout=0.2)
+    took = time.perf_counter() - t0
+    check("예산 초과 → Timeout", res["reason"] == "gemini_error:Timeout", res)
+    check("예산 안에 반환", took < 0.3, f"{took:.3f}s")
+    calls = Handler.calls["generate"]
+    res = await route(timeout=0)
+    check("예산 0 → llm_budget_exhausted", res["reason"] == "llm_budget_exhausted", res)
+    check("예산 0이면 upstream 호출 없음", Handler.calls["generate"] == calls, Handler.calls)
+    await asyncio.sleep(0.6)  # 떠 있는 호출이 끝나고 브레이커에 기록될 때까지
+    _fake()
+    await route()  # 연속 실패 수 초기화
+
+    # 6) 헤징: LLM_HEDGE_MS 안에 오면 보내지 않고, 늦으면 한 번 더 보냄
+    hedges = r._hedges
+    res = await route()
+    check("빠른 응답은 헤지 없음", res["reason"] == "gemini_ok" and r._hedges == hedges, r.stats())
+    _fake(latency_ms=HEDGE_MS * 2.5)
+    calls = Handler.calls["generate"]
+    res = await route()
+    check("느린 응답이면 헤지 1회", res["reason"] == "gemini_ok" and r._hedges == hedges + 1, r.stats())
+    check("헤지는 upstream 호출 2회", Handler.calls["generate"] == calls + 2, Handler.calls)
+
+    await r.close_client()
+
+
+def main() -> int:
+    srv = _serve()
+    # llm_router는 import 시점에 환경 변수를 읽으므로 먼저 설정
+    os.environ.update({
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{srv.server_address[1]}", "GEMINI_API_KEY": "dummy",
+        "LLM_TIMEOUT_SEC": "2", "LLM_BREAKER_FAILURES": str(FAILURES), "LLM_BREAKER_RESET_SEC": str(RESET_SEC),
+        "LLM_HEDGE_MS": str(HEDGE_MS), "LLM_BATCH_ENABLED": "0",
+    })
+    from app.services import llm_router
+    llm_router.redis_client = FakeRedis()
+    failed: List[str] = []
+    try:
+        asyncio.run(_checks(llm_router, failed))
+    finally:
+        srv.shutdown()
+    print(f"\n{len(failed)} failed" if failed else "\nall passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
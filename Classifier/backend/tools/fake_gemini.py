@@ -0,0 +1,102 @@
+"""
+로컬 개발용 가짜 Gemini 서버 (ListModels / generateContent만 흉내).
+지연·오류를 주입해 LLM 라우터의 타임아웃, 서킷 브레이커, 헤징 동작을 오프라인에서 확인한다.
+
+사용:
+  python tools/fake_gemini.py --port 8089 --latency-ms 300 --error-rate 0.2
+  GEMINI_API_KEY=dummy GEMINI_BASE_URL=http://127.0.0.1:8089 ./uvicorn_run.sh
+  python tools/check_llm_router.py       # 이 서버를 임시 포트로 띄워 브레이커·데드라인·헤징을 자동 검증
+"""
+import argparse, json, random, re, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LABELS = ["시설", "환경", "전산", "기타"]
+KEYWORDS = {"시설": ["엘리베이터", "조명", "누수", "문", "의자"], "환경": ["쓰레기", "악취", "소음", "벌레"],
+            "전산": ["와이파이", "인터넷", "프린터", "로그인", "컴퓨터"]}
+
+
+def guess(text: str) -> str:
+    for label, kws in KEYWORDS.items():
+        if any(k in text for k in kws):
+            return label
+    return "기타"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    error_rate = 0.0
+    malformed_rate = 0.0
+    calls = {"list": 0, "generate": 0, "errors": 0, "malformed": 0}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code: int, obj):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not re.match(r"^/v1(beta)?/models", self.path):
+            return self._send(404, {"error": "not found"})
+        self.calls["list"] += 1
+        self._send(200, {"models": [{"name": "models/gemini-1.5-flash"}]})
+
+    def do_POST(self):
+        n = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(n) or b"{}")
+        self.calls["generate"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self.calls["errors"] += 1
+            return self._send(503, {"error": {"code": 503, "message": "fake overload"}})
+        if random.random() < self.malformed_rate:  # 200이지만 parts[0].text가 문자열이 아닌 응답
+            self.calls["malformed"] += 1
+            return self._send(200, {"candidates": [{"content": {"parts": [{"text": {"label": "기타"}}]}}]})
+        prompt = body["contents"][0]["parts"][0]["text"]
+        if "JSON 배열" in prompt:  # 배치 프롬프트: "[i] 문장" 줄마다 하나씩
+            items = [{"id": int(i), "label": guess(t), "reason": "fake"}
+                     for i, t in re.findall(r"^\[(\d+)\] (.*)$", prompt, flags=re.M)]
+            out = json.dumps(items, ensure_ascii=False)
+            return self._send(200, {"candidates": [{"content": {"parts": [{"text": out}]}}]})
+        m = re.search(r"문장: (.*)", prompt)
+        text = m.group(1) if m else prompt
+        out = '```json\n' + json.dumps({"label": guess(text), "reason": "fake"}, ensure_ascii=False) + '\n```'
+        self._send(200, {"candidates": [{"content": {"parts": [{"text": out}]}}]})
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 헤지 패자·데드라인 초과로 클라이언트가 먼저 끊은 연결은 정상 흐름
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="fake Gemini API server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency-ms", type=float, default=0, help="generateContent 응답 지연")
+    ap.add_argument("--error-rate", type=float, default=0, help="503으로 응답할 비율(0~1)")
+    ap.add_argument("--malformed-rate", type=float, default=0, help="text가 문자열이 아닌 200 응답 비율(0~1)")
+    args = ap.parse_args()
+    Handler.latency = args.latency_ms / 1000
+    Handler.error_rate = args.error_rate
+    Handler.malformed_rate = args.malformed_rate
+    srv = Server((args.host, args.port), Handler)
+    print(f"fake gemini on http://{args.host}:{args.port} (latency={args.latency_ms}ms, error_rate={args.error_rate})")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
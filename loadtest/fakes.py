@@ -0,0 +1,248 @@
+"""
+부하 테스트용 로컬 대역(stand-in) 서버: Redis(RESP) / SMTP 싱크.
+둘 다 asyncio 서버라 부하 발생기와 같은 이벤트 루프에서 돈다. (Gemini 대역은 Classifier/backend/tools/fake_gemini.py)
+"""
+import asyncio, base64, fnmatch, time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+
+# ---------------- Redis ----------------
+class FakeRedis:
+    """
+    메모리 Redis. 서비스가 쓰는 명령만: PING, GET, SET(EX/PX/NX), DEL, EXISTS, EXPIRE, TTL, INCR, KEYS,
+    PUBLISH/SUBSCRIBE/UNSUBSCRIBE, SELECT·CLIENT·HELLO(접속 인사), FLUSHALL. 프로토콜은 RESP2.
+    """
+
+    def __init__(self):
+        self.data: Dict[bytes, bytes] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = defaultdict(set)
+        self.commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host="127.0.0.1", port=0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # --- 프로세스 내 클라이언트: 서버를 띄우지 않고 같은 저장소를 쓰는 벤치·점검 스크립트용(redis.asyncio와 같은 모양) ---
+    @staticmethod
+    def _b(v) -> bytes:
+        return v if isinstance(v, bytes) else str(v).encode()
+
+    async def get(self, key):
+        return self._execute(b"GET", [self._b(key)])
+
+    async def set(self, key, value, ex=None):
+        return self._execute(b"SET", [self._b(key), self._b(value)] + ([b"EX", self._b(ex)] if ex else []))
+
+    async def expire(self, key, seconds):
+        return self._execute(b"EXPIRE", [self._b(key), self._b(seconds)])
+
+    # --- RESP ---
+    @staticmethod
+    async def _read_command(r: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await r.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):  # 인라인 명령(redis-cli 등)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            n = int((await r.readline())[1:])
+            args.append((await r.readexactly(n + 2))[:-2])
+        return args
+
+    @staticmethod
+    def _enc(v) -> bytes:
+        if v is None:
+            return b"$-1\r\n"
+        if isinstance(v, bool):
+            v = int(v)
+        if isinstance(v, int):
+            return b":%d\r\n" % v
+        if isinstance(v, str):  # 상태 문자열
+            return b"+" + v.encode() + b"\r\n"
+        if isinstance(v, Exception):
+            return b"-ERR " + str(v).encode() + b"\r\n"
+        if isinstance(v, (list, tuple)):
+            return b"*%d\r\n" % len(v) + b"".join(FakeRedis._enc(x) for x in v)
+        return b"$%d\r\n%s\r\n" % (len(v), v)
+
+    def _alive(self, key: bytes) -> bool:
+        exp = self.expires.get(key)
+        if exp is not None and exp <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    async def _handle(self, r: asyncio.StreamReader, w: asyncio.StreamWriter):
+        subs: Set[bytes] = set()
+        try:
+            while True:
+                args = await self._read_command(r)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                self.commands += 1
+                cmd = args[0].upper()
+                if cmd in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    for ch in args[1:]:
+                        if cmd == b"SUBSCRIBE":
+                            subs.add(ch)
+                            self.channels[ch].add(w)
+                        else:
+                            subs.discard(ch)
+                            self.channels[ch].discard(w)
+                        w.write(self._enc([cmd.lower(), ch, len(subs)]))
+                else:
+                    w.write(self._enc(self._execute(cmd, args[1:])))
+                await w.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):  # 종료 시 취소 포함
+            pass
+        finally:
+            for ch in subs:
+                self.channels[ch].discard(w)
+            w.close()
+
+    def _execute(self, cmd: bytes, a: List[bytes]):
+        try:
+            if cmd == b"PING":
+                return a[0] if a else "PONG"
+            if cmd in (b"SELECT", b"CLIENT", b"FLUSHDB", b"FLUSHALL"):
+                if cmd in (b"FLUSHDB", b"FLUSHALL"):
+                    self.data.clear()
+                    self.expires.clear()
+                return "OK"
+            if cmd == b"HELLO":
+                return Exception("unknown command 'HELLO'")  # RESP2만 → 클라이언트가 기본값으로 진행
+            if cmd == b"GET":
+                return self.data.get(a[0]) if self._alive(a[0]) else None
+            if cmd == b"SET":
+                key, val, opts = a[0], a[1], [x.upper() for x in a[2:]]
+                if b"NX" in opts and self._alive(key):
+                    return None
+                self.data[key] = val
+                self.expires.pop(key, None)
+                for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                    if unit in opts:
+                        self.expires[key] = time.monotonic() + int(a[2 + opts.index(unit) + 1]) * scale
+                return "OK"
+            if cmd == b"DEL":
+                return sum(1 for k in a if self._alive(k) and self.data.pop(k, None) is not None)
+            if cmd == b"EXISTS":
+                return sum(1 for k in a if self._alive(k))
+            if cmd == b"EXPIRE":
+                if not self._alive(a[0]):
+                    return 0
+                self.expires[a[0]] = time.monotonic() + int(a[1])
+                return 1
+            if cmd == b"TTL":
+                if not self._alive(a[0]):
+                    return -2
+                exp = self.expires.get(a[0])
+                return -1 if exp is None else int(exp - time.monotonic())
+            if cmd == b"INCR":
+                v = int(self.data.get(a[0], b"0")) + 1 if self._alive(a[0]) else 1
+                self.data[a[0]] = str(v).encode()
+                return v
+            if cmd == b"KEYS":
+                pat = a[0].decode()
+                return [k for k in list(self.data) if self._alive(k) and fnmatch.fnmatchcase(k.decode(), pat)]
+            if cmd == b"PUBLISH":
+                subs = list(self.channels.get(a[0], ()))
+                for sw in subs:
+                    sw.write(self._enc([b"message", a[0], a[1]]))
+                return len(subs)
+            return Exception(f"unknown command '{cmd.decode()}'")
+        except (IndexError, ValueError) as e:
+            return Exception(f"bad arguments: {e}")
+
+
+# ---------------- SMTP ----------------
+class SmtpSink:
+    """
+    받기만 하는 SMTP 서버(mailhog 대역). EHLO에 AUTH PLAIN/LOGIN을 광고하고 어떤 자격 증명이든 통과시킨다.
+    STARTTLS는 없으므로 클라이언트는 평문 + 인증으로 붙는다(fastapi-mail USE_CREDENTIALS=True 대응).
+    """
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.messages = 0
+        self.connections = 0
+        self.recipients = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host="127.0.0.1", port=0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, r: asyncio.StreamReader, w: asyncio.StreamWriter):
+        self.connections += 1
+
+        def reply(s: str):
+            w.write(s.encode() + b"\r\n")
+
+        reply("220 sink.local ESMTP ready")
+        try:
+            while True:
+                await w.drain()
+                line = await r.readline()
+                if not line:
+                    break
+                cmd = line.decode(errors="replace").strip()
+                verb = cmd.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    w.write(b"250-sink.local\r\n250-8BITMIME\r\n250-SIZE 52428800\r\n250 AUTH PLAIN LOGIN\r\n")
+                elif verb == "HELO":
+                    reply("250 sink.local")
+                elif verb == "AUTH":
+                    parts = cmd.split()
+                    mech = parts[1].upper() if len(parts) > 1 else ""
+                    if mech == "PLAIN" and len(parts) < 3:
+                        reply("334 ")
+                        await w.drain()
+                        await r.readline()
+                    elif mech == "LOGIN":
+                        for prompt in (b"Username:", b"Password:"):
+                            if len(parts) > 2 and prompt == b"Username:":
+                                continue  # 사용자명이 명령에 같이 옴
+                            reply("334 " + base64.b64encode(prompt).decode())
+                            await w.drain()
+                            await r.readline()
+                    reply("235 2.7.0 Authentication successful")
+                elif verb in ("MAIL", "RSET", "NOOP"):
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    self.recipients += 1
+                    reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await w.drain()
+                    while (await r.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    self.messages += 1
+                    reply("250 OK queued")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    await w.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):  # 종료 시 취소 포함
+            pass
+        finally:
+            w.close()
@@ -0,0 +1,292 @@
+"""
+두 서비스(Backend ai-report, Classifier) 종단 부하 테스트.
+
+외부 의존성은 로컬 대역으로 바꿔 띄운다.
+  Redis  → fakes.FakeRedis (메모리, RESP)
+  SMTP   → fakes.SmtpSink (mailhog 대역, AUTH 통과)
+  Gemini → Classifier/backend/tools/fake_gemini.py (--gemini-latency-ms / --gemini-error-rate)
+두 앱은 uvicorn 하위 프로세스로 띄우고(임시 sqlite DB), 동시 사용자 수를 단계적으로 올리며
+엔드포인트별 처리량·지연 백분위·오류율을 잰다.
+
+  python loadtest/run.py --steps 1,4,16,64 --duration 20
+  python loadtest/run.py --mix classify=1 --steps 8,32 --classifier-url http://pod:8000   # 이미 떠 있는 서버 대상
+
+부하 발생기와 대역 서버도 같은 머신의 CPU를 쓰므로, 포드 한 개의 한계를 잴 때는 앱 프로세스에 코어를 고정하거나
+--classifier-url/--backend-url로 다른 머신의 앱을 겨냥할 것.
+"""
+import os, sys, json, time, random, socket, asyncio, argparse, tempfile, subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from fakes import FakeRedis, SmtpSink
+
+ROOT = Path(__file__).resolve().parents[1]
+CLASSIFIER_DIR = ROOT / "Classifier" / "backend"
+BACKEND_DIR = ROOT / "Backend" / "ai-report"
+
+sys.path.insert(0, str(CLASSIFIER_DIR))
+from bench.corpus import generate  # noqa: E402  (합성 민원 코퍼스 재사용)
+
+DEFAULT_MIX = "login=1,report=3,classify=6,route=3,upload=1"
+BACKEND_USER = {"email": "user@test.com", "password": "pass1234"}  # Backend 시작 시 시드되는 계정
+CLASSIFIER_USER = {"username": "admin", "password": "admin123!"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Stack:
+    """대역 서버 + 앱 하위 프로세스 묶음."""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp = Path(tempfile.mkdtemp(prefix="loadtest-"))
+        self.procs: List[subprocess.Popen] = []
+        self.redis = FakeRedis()
+        self.smtp = SmtpSink(args.smtp_latency_ms)
+        self.classifier_url = args.classifier_url
+        self.backend_url = args.backend_url
+
+    def _spawn(self, name: str, cmd: List[str], cwd: Path, env: Dict[str, str]) -> subprocess.Popen:
+        log = open(self.tmp / f"{name}.log", "wb")
+        p = subprocess.Popen(cmd, cwd=cwd, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+        self.procs.append(p)
+        return p
+
+    async def start(self):
+        redis_port = await self.redis.start()
+        smtp_port = await self.smtp.start()
+        gemini_port = _free_port()
+        self._spawn("gemini", [sys.executable, "tools/fake_gemini.py", "--port", str(gemini_port),
+                               "--latency-ms", str(self.args.gemini_latency_ms),
+                               "--error-rate", str(self.args.gemini_error_rate)], CLASSIFIER_DIR, {})
+        uvicorn = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                   "--workers", str(self.args.workers), "--log-level", "warning"]
+        if not self.classifier_url:
+            port = _free_port()
+            self._spawn("classifier", uvicorn + ["--port", str(port)], CLASSIFIER_DIR, {
+                "REDIS_URL": f"redis://127.0.0.1:{redis_port}/0",
+                "GEMINI_BASE_URL": f"http://127.0.0.1:{gemini_port}",
+                "GEMINI_API_KEY": "loadtest",
+                "SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(smtp_port),
+                "DB_URL": f"sqlite:///{self.tmp / 'classifier.db'}",
+            })
+            self.classifier_url = f"http://127.0.0.1:{port}"
+        if not self.backend_url:
+            env = {
+                "DB_URL": f"sqlite+aiosqlite:///{self.tmp / 'backend.db'}",
+                "LOCAL_STORAGE_DIR": str(self.tmp / "files"),
+                "MAIL_SERVER": "127.0.0.1", "MAIL_PORT": str(smtp_port),
+                "MAIL_USERNAME": "loadtest", "MAIL_PASSWORD": "loadtest", "MAIL_FROM": "noreply@example.com",
+                "MAIL_TLS": "false", "MAIL_SSL": "false",
+            }
+            # 스키마는 alembic으로(앱은 테이블을 만들지 않음)
+            subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR,
+                           env={**os.environ, **env}, check=True, capture_output=True)
+            port = _free_port()
+            self._spawn("backend", uvicorn + ["--port", str(port)], BACKEND_DIR, env)
+            self.backend_url = f"http://127.0.0.1:{port}"
+        await self._wait(f"{self.classifier_url}/health")
+        await self._wait(f"{self.backend_url}/api/v1/health")
+
+    async def _wait(self, url: str, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as c:
+            while time.monotonic() < deadline:
+                for p in self.procs:
+                    if p.poll() is not None:
+                        raise RuntimeError(f"process exited early: {p.args} (logs in {self.tmp})")
+                try:
+                    if (await c.get(url, timeout=2)).status_code == 200:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.3)
+        raise TimeoutError(f"{url} not ready (logs in {self.tmp})")
+
+    async def stop(self):
+        for p in self.procs:
+            p.terminate()
+        for p in self.procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        await self.redis.stop()
+        await self.smtp.stop()
+
+
+# ---------------- 시나리오 ----------------
+class Session:
+    """가상 사용자 하나(토큰은 처음 한 번 받아서 재사용)."""
+
+    def __init__(self, stack: Stack, client: httpx.AsyncClient, texts: List[str], rng: random.Random):
+        self.stack, self.client, self.texts, self.rng = stack, client, texts, rng
+        self.backend_token: Optional[str] = None
+        self.classifier_token: Optional[str] = None
+
+    def text(self) -> str:
+        return self.rng.choice(self.texts)
+
+    async def login(self) -> httpx.Response:
+        r = await self.client.post(f"{self.stack.backend_url}/api/v1/auth/login", json=BACKEND_USER)
+        if r.status_code == 200:
+            self.backend_token = r.json()["access_token"]
+        return r
+
+    async def report(self) -> httpx.Response:
+        if self.backend_token is None:
+            await self.login()
+        body = self.text()
+        return await self.client.post(
+            f"{self.stack.backend_url}/api/v1/reports", params={"auto_classify": "true"},
+            json={"title": body[:30], "content": body},
+            headers={"Authorization": f"Bearer {self.backend_token}"})
+
+    async def classify(self) -> httpx.Response:
+        return await self.client.post(f"{self.stack.classifier_url}/ml/classify", json={"text": self.text()})
+
+    async def route(self) -> httpx.Response:
+        return await self.client.post(f"{self.stack.classifier_url}/ml/route", json={"text": self.text()})
+
+    async def upload(self) -> httpx.Response:
+        if self.classifier_token is None:
+            r = await self.client.post(f"{self.stack.classifier_url}/auth/login", json=CLASSIFIER_USER)
+            self.classifier_token = r.json()["access_token"]
+        body = self.text()
+        blob = self.rng.randbytes(self.rng.randint(10_000, 500_000))  # 사진 첨부 크기 대역
+        return await self.client.post(
+            f"{self.stack.classifier_url}/reports/submit",
+            data={"title": body[:30], "content": body}, files={"file": ("photo.jpg", blob, "image/jpeg")},
+            headers={"Authorization": f"Bearer {self.classifier_token}"})
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, w = part.partition("=")
+        if not hasattr(Session, name.strip()):
+            raise SystemExit(f"unknown scenario: {name}")
+        mix[name.strip()] = float(w or 1)
+    return mix
+
+
+async def run_step(stack: Stack, concurrency: int, duration: float, mix: Dict[str, float],
+                   texts: List[str], timeout: float, seed: int) -> Dict[str, list]:
+    """concurrency명이 duration초 동안 mix 비율로 요청. 반환: 시나리오 -> [(지연 s, 상태코드), ...]"""
+    records: Dict[str, list] = defaultdict(list)
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        stop_at = time.monotonic() + duration
+
+        async def user(i: int):
+            rng = random.Random(seed * 1000 + i)
+            s = Session(stack, client, texts, rng)
+            while time.monotonic() < stop_at:
+                name = rng.choices(names, weights)[0]
+                t0 = time.perf_counter()
+                try:
+                    status = (await getattr(s, name)()).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                records[name].append((time.perf_counter() - t0, status))
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return records
+
+
+def summarize(records: Dict[str, list], duration: float) -> Dict[str, dict]:
+    out = {}
+    everything = []
+    for name, rs in sorted(records.items()):
+        everything += rs
+        out[name] = _stats(rs, duration)
+    out["TOTAL"] = _stats(everything, duration)
+    return out
+
+
+def _stats(rs: list, duration: float) -> dict:
+    if not rs:
+        return {"requests": 0}
+    lat = np.array([r[0] for r in rs]) * 1000
+    errors = defaultdict(int)
+    for _, st in rs:
+        if not (isinstance(st, int) and st < 400):
+            errors[str(st)] += 1
+    return {
+        "requests": len(rs),
+        "rps": len(rs) / duration,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p90_ms": float(np.percentile(lat, 90)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+        "error_rate": sum(errors.values()) / len(rs),
+        "errors": dict(errors),
+    }
+
+
+def print_step(concurrency: int, summary: Dict[str, dict]):
+    print(f"\n== concurrency {concurrency}")
+    print(f"{'scenario':10s} {'req':>7s} {'rps':>8s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'err%':>6s}  errors")
+    for name, s in summary.items():
+        if not s["requests"]:
+            continue
+        print(f"{name:10s} {s['requests']:>7d} {s['rps']:>8.1f} {s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} "
+              f"{s['p99_ms']:>8.1f} {s['error_rate'] * 100:>6.2f}  {s['errors'] or ''}")
+
+
+async def main_async(args) -> dict:
+    mix = parse_mix(args.mix)
+    texts = [t for t, _ in generate(args.corpus, args.seed)]
+    stack = Stack(args)
+    await stack.start()
+    result = {"config": {k: v for k, v in vars(args).items()}, "steps": []}
+    try:
+        if args.warmup > 0:
+            await run_step(stack, min(4, max(args.steps)), args.warmup, mix, texts, args.timeout, args.seed)
+        for c in args.steps:
+            records = await run_step(stack, c, args.duration, mix, texts, args.timeout, args.seed + c)
+            summary = summarize(records, args.duration)
+            print_step(c, summary)
+            result["steps"].append({"concurrency": c, "summary": summary})
+        result["stand_ins"] = {"redis_commands": stack.redis.commands, "smtp_messages": stack.smtp.messages,
+                               "smtp_connections": stack.smtp.connections}
+        print(f"\nstand-ins: {result['stand_ins']}  (logs: {stack.tmp})")
+    finally:
+        await stack.stop()
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="end-to-end load test for Backend + Classifier")
+    ap.add_argument("--steps", type=lambda s: [int(x) for x in s.split(",")], default=[1, 4, 16, 64],
+                    help="동시 사용자 수 단계(쉼표 구분)")
+    ap.add_argument("--duration", type=float, default=20, help="단계별 측정 시간(초)")
+    ap.add_argument("--warmup", type=float, default=5, help="측정 전 예열 시간(초)")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="시나리오=가중치 목록(login, report, classify, route, upload)")
+    ap.add_argument("--timeout", type=float, default=30, help="요청 타임아웃(초)")
+    ap.add_argument("--workers", type=int, default=1, help="앱별 uvicorn 워커 수(포드 하나 = 1)")
+    ap.add_argument("--gemini-latency-ms", type=float, default=800)
+    ap.add_argument("--gemini-error-rate", type=float, default=0.0)
+    ap.add_argument("--smtp-latency-ms", type=float, default=50)
+    ap.add_argument("--classifier-url", help="이미 떠 있는 Classifier(지정하면 띄우지 않음)")
+    ap.add_argument("--backend-url", help="이미 떠 있는 Backend(지정하면 띄우지 않음)")
+    ap.add_argument("--corpus", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="결과 JSON 경로")
+    args = ap.parse_args(argv)
+    result = asyncio.run(main_async(args))
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()